@@ -0,0 +1,43 @@
+"""Covering unique index for login lookup on users.email
+
+Revision ID: 002_users_email_covering
+Revises: 001_initial
+Create Date: 2026-10-14 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002_users_email_covering'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Login selects (id, password_hash, is_active) by email; INCLUDE lets
+    # Postgres answer it with an index-only scan instead of a heap fetch.
+    # Built CONCURRENTLY (outside the migration transaction) so populated
+    # users tables are not write-locked while the index builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_covering',
+            'users',
+            ['email'],
+            unique=True,
+            postgresql_include=['password_hash', 'is_active', 'id'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True)
+    
+    # The covering index enforces uniqueness on its own, so the column's
+    # original unique constraint (and its index) would only be a second
+    # unique index to maintain on every insert
+    op.drop_constraint('users_email_key', 'users', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email', 'users', ['email'], postgresql_concurrently=True)
+        op.drop_index('ix_users_email_covering', table_name='users', postgresql_concurrently=True)
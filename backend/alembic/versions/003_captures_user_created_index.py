@@ -0,0 +1,33 @@
+"""Index for newest-first capture listings per user
+
+Revision ID: 003_captures_user_created
+Revises: 002_users_email_covering
+Create Date: 2026-10-14 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_captures_user_created'
+down_revision = '002_users_email_covering'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # "List a user's captures newest-first" becomes a single index range scan;
+    # INCLUDE (status, source) lets the listing be served index-only
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_captures_user_created',
+            'captures',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_include=['status', 'source'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_captures_user_created', table_name='captures', postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""Trim audit_logs indexes for write-heavy inserts
+
+Revision ID: 004_audit_logs_timestamp_desc
+Revises: 003_captures_user_created
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_audit_logs_timestamp_desc'
+down_revision = '003_captures_user_created'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nothing filters on action alone, so ix_audit_logs_action only costs
+    # insert throughput; newest-first scans get a DESC timestamp index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_audit_logs_timestamp_desc',
+            'audit_logs',
+            [sa.text('timestamp DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs', postgresql_concurrently=True)
+        op.drop_index('ix_audit_logs_action', table_name='audit_logs', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_audit_logs_action', 'audit_logs', ['action'], postgresql_concurrently=True)
+        op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'], postgresql_concurrently=True)
+        op.drop_index('ix_audit_logs_timestamp_desc', table_name='audit_logs', postgresql_concurrently=True)
@@ -0,0 +1,25 @@
+"""Add uploading capture status
+
+Revision ID: 005_capture_status_uploading
+Revises: 004_audit_logs_timestamp_desc
+Create Date: 2026-10-14 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_capture_status_uploading'
+down_revision = '004_audit_logs_timestamp_desc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Captures sit in 'uploading' while the upload worker moves images to MinIO
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE capturestatus ADD VALUE IF NOT EXISTS 'uploading' BEFORE 'queued'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; move rows off it and leave the label
+    op.execute("UPDATE captures SET status = 'queued' WHERE status = 'uploading'")
@@ -0,0 +1,41 @@
+"""Keyset pagination index for capture listings
+
+Revision ID: 006_captures_keyset_index
+Revises: 005_capture_status_uploading
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_captures_keyset_index'
+down_revision = '005_capture_status_uploading'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listings page on (created_at, id) DESC; id breaks created_at ties and
+    # updated_at joins the INCLUDE list so a page is served index-only
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_captures_user_created_id',
+            'captures',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_include=['status', 'source', 'updated_at'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_captures_user_created', table_name='captures', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_captures_user_created',
+            'captures',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_include=['status', 'source'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_captures_user_created_id', table_name='captures', postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""Materialized view of completed captures' metrics for the dashboard timeline
+
+Revision ID: 007_user_metrics_view
+Revises: 006_captures_keyset_index
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_user_metrics_view'
+down_revision = '006_captures_keyset_index'
+branch_labels = None
+depends_on = None
+
+# Must match db.models.USER_METRICS_VIEW_METRICS
+METRICS = (
+    'height_cm',
+    'shoulder_width_cm',
+    'chest_circumference_cm',
+    'waist_circumference_cm',
+    'hip_circumference_cm',
+    'inseam_cm',
+    'torso_length_cm',
+    'neck_circumference_cm',
+)
+
+
+def upgrade() -> None:
+    metric_columns = ',\n        '.join(
+        f"(m.metrics_json->'current'->>'{metric}')::float AS {metric}"
+        for metric in METRICS
+    )
+    op.execute(f"""
+        CREATE MATERIALIZED VIEW mv_user_metrics AS
+        SELECT c.user_id, c.id AS capture_id, c.created_at,
+        {metric_columns}
+        FROM captures c
+        JOIN capture_metrics m ON m.capture_id = c.id
+        WHERE c.status = 'done'
+    """)
+    # The unique index is what allows REFRESH ... CONCURRENTLY
+    op.create_index('ux_mv_user_metrics_capture', 'mv_user_metrics', ['capture_id'], unique=True)
+    op.create_index(
+        'idx_mv_user_metrics_user_created',
+        'mv_user_metrics',
+        ['user_id', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_user_metrics")
@@ -0,0 +1,52 @@
+"""Dashboard indexes: status-filtered listings and completed-capture lookups
+
+Revision ID: 008_captures_dashboard_indexes
+Revises: 007_user_metrics_view
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_captures_dashboard_indexes'
+down_revision = '007_user_metrics_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Status-filtered listing pages in index order; its (user_id, status)
+        # prefix makes idx_user_status redundant
+        op.create_index(
+            'ix_captures_user_status_created',
+            'captures',
+            ['user_id', 'status', sa.text('created_at DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_user_status', table_name='captures', postgresql_concurrently=True)
+        
+        # Latest completed capture and the JSONB timeline fallback only ever
+        # look at done captures
+        op.create_index(
+            'ix_captures_user_done_created',
+            'captures',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_where=sa.text("status = 'done'"),
+            postgresql_concurrently=True
+        )
+        
+        op.execute("ANALYZE captures")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_captures_user_done_created', table_name='captures', postgresql_concurrently=True)
+        op.create_index(
+            'idx_user_status',
+            'captures',
+            ['user_id', 'status'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_captures_user_status_created', table_name='captures', postgresql_concurrently=True)
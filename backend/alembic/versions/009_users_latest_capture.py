@@ -0,0 +1,78 @@
+"""Denormalize each user's latest completed capture onto users
+
+Revision ID: 009_users_latest_capture
+Revises: 008_captures_dashboard_indexes
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009_users_latest_capture'
+down_revision = '008_captures_dashboard_indexes'
+branch_labels = None
+depends_on = None
+
+# Recompute rather than copy NEW: an edit or delete of the latest capture
+# must fall back to the previous completed one
+_REFRESH_USER_LATEST = """
+    UPDATE users u
+    SET (latest_capture_id, latest_capture_at, latest_metrics, latest_skin) = (
+        SELECT c.id, c.created_at,
+               CASE WHEN m.id IS NOT NULL THEN COALESCE(m.metrics_json->'current', '{}'::jsonb) END,
+               m.skin_json
+        FROM captures c
+        LEFT JOIN capture_metrics m ON m.capture_id = c.id
+        WHERE c.user_id = u.id AND c.status = 'done'
+        ORDER BY c.created_at DESC
+        LIMIT 1
+    )
+"""
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('latest_capture_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('users', sa.Column('latest_capture_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('latest_metrics', postgresql.JSONB(), nullable=True))
+    op.add_column('users', sa.Column('latest_skin', postgresql.JSONB(), nullable=True))
+    
+    op.execute(f"""
+        CREATE FUNCTION refresh_user_latest_capture() RETURNS trigger AS $$
+        DECLARE
+            target_user uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                target_user := OLD.user_id;
+            ELSE
+                target_user := NEW.user_id;
+            END IF;
+            {_REFRESH_USER_LATEST}
+            WHERE u.id = target_user;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    
+    # Deferred to commit: the worker updates the capture to done before its
+    # capture_metrics row is inserted in the same transaction, and metrics
+    # uploads insert the capture first
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER trg_captures_user_latest
+        AFTER INSERT OR UPDATE OF status OR DELETE ON captures
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION refresh_user_latest_capture()
+    """)
+    
+    # Backfill existing users
+    op.execute(_REFRESH_USER_LATEST)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_captures_user_latest ON captures")
+    op.execute("DROP FUNCTION IF EXISTS refresh_user_latest_capture()")
+    op.drop_column('users', 'latest_skin')
+    op.drop_column('users', 'latest_metrics')
+    op.drop_column('users', 'latest_capture_at')
+    op.drop_column('users', 'latest_capture_id')
@@ -0,0 +1,37 @@
+"""GIN jsonb_path_ops index on capture_metrics.metrics_json
+
+Revision ID: 010_capture_metrics_gin
+Revises: 009_users_latest_capture
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010_capture_metrics_gin'
+down_revision = '009_users_latest_capture'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # jsonb_path_ops: smaller and faster than the default jsonb_ops,
+        # and covers the @> and @? operators the queries use
+        op.create_index(
+            'ix_capture_metrics_metrics_gin',
+            'capture_metrics',
+            ['metrics_json'],
+            postgresql_using='gin',
+            postgresql_ops={'metrics_json': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_capture_metrics_metrics_gin',
+            table_name='capture_metrics',
+            postgresql_concurrently=True
+        )
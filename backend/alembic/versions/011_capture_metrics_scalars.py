@@ -0,0 +1,57 @@
+"""Promote hot capture metrics scalars out of JSONB into generated columns
+
+Revision ID: 011_capture_metrics_scalars
+Revises: 010_capture_metrics_gin
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_capture_metrics_scalars'
+down_revision = '010_capture_metrics_gin'
+branch_labels = None
+depends_on = None
+
+# Must match db.models.CAPTURE_METRICS_COLUMNS
+COLUMNS = (
+    ('height_cm', sa.Float(), "(metrics_json->'current'->>'height_cm')::float"),
+    ('shoulder_width_cm', sa.Float(), "(metrics_json->'current'->>'shoulder_width_cm')::float"),
+    ('monk_bucket', sa.Integer(), "(skin_json->>'monk_bucket')::integer"),
+    ('overall_confidence', sa.Float(), "(quality_json->>'overall_confidence')::float"),
+    ('pose_model_version', sa.String(32), "(model_versions->>'pose')::varchar(32)"),
+)
+INDEXED = ('height_cm', 'monk_bucket', 'overall_confidence')
+
+
+def upgrade() -> None:
+    # STORED generated columns are filled for existing rows as part of the
+    # ADD COLUMN, so there is no separate backfill
+    for name, type_, expression in COLUMNS:
+        op.add_column(
+            'capture_metrics',
+            sa.Column(name, type_, sa.Computed(expression, persisted=True), nullable=True)
+        )
+    
+    with op.get_context().autocommit_block():
+        for name in INDEXED:
+            op.create_index(
+                f'ix_capture_metrics_{name}',
+                'capture_metrics',
+                [name],
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXED:
+            op.drop_index(
+                f'ix_capture_metrics_{name}',
+                table_name='capture_metrics',
+                postgresql_concurrently=True
+            )
+    
+    for name, _, _ in reversed(COLUMNS):
+        op.drop_column('capture_metrics', name)
@@ -0,0 +1,48 @@
+"""Ordered audit-log index per resource; drop redundant single-column indexes
+
+Revision ID: 012_audit_resource_time_index
+Revises: 011_capture_metrics_scalars
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_audit_resource_time_index'
+down_revision = '011_capture_metrics_scalars'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # "Recent events for a resource" becomes one ordered range scan;
+        # the (resource_type, resource_id) prefix replaces idx_resource
+        op.create_index(
+            'idx_audit_resource_time',
+            'audit_logs',
+            ['resource_type', 'resource_id', sa.text('timestamp DESC')],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_resource', table_name='audit_logs', postgresql_concurrently=True)
+        
+        # Every captures query filters by user first; the per-user indexes
+        # cover created_at ordering. Migration 001 named it
+        # ix_captures_created_at, the model idx_created_at.
+        for name in ('ix_captures_created_at', 'idx_created_at'):
+            op.drop_index(name, table_name='captures', postgresql_concurrently=True, if_exists=True)
+        
+        op.execute("ANALYZE audit_logs")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_captures_created_at', 'captures', ['created_at'], postgresql_concurrently=True)
+        op.create_index(
+            'idx_resource',
+            'audit_logs',
+            ['resource_type', 'resource_id'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('idx_audit_resource_time', table_name='audit_logs', postgresql_concurrently=True)
@@ -3,11 +3,13 @@ Authentication router with endpoints for registration, login, and user managemen
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import logging
 
-from db import get_db, User
+from db import get_async_db, User
 from app.auth.schemas import (
     UserRegister,
     UserLogin,
@@ -18,7 +20,13 @@ from app.auth.schemas import (
     PasswordChange
 )
 from app.auth.service import AuthService
-from app.dependencies import get_current_user, get_current_active_user
+from app.dependencies import (
+    get_current_user,
+    get_current_active_user,
+    invalidate_cached_token,
+    invalidate_cached_user,
+    security
+)
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -29,7 +37,7 @@ router = APIRouter()
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserRegister,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user
@@ -39,12 +47,13 @@ async def register(
     - **consent_flags**: Optional consent preferences
     """
     try:
-        user = AuthService.register_user(db, user_data)
+        user = await AuthService.register_user(db, user_data)
         
         # Generate tokens
         settings = get_settings()
-        access_token = AuthService.create_access_token(user.id)
-        refresh_token = AuthService.create_refresh_token(user.id)
+        user_id = str(user.id)
+        access_token = AuthService.create_access_token(user_id)
+        refresh_token = AuthService.create_refresh_token(user_id)
         
         return TokenResponse(
             access_token=access_token,
@@ -62,14 +71,14 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with email and password
     
     Returns JWT access and refresh tokens
     """
-    user = AuthService.authenticate_user(db, login_data)
+    user = await AuthService.authenticate_user(db, login_data)
     
     if not user:
         raise HTTPException(
@@ -80,8 +89,9 @@ async def login(
     
     # Generate tokens
     settings = get_settings()
-    access_token = AuthService.create_access_token(user.id)
-    refresh_token = AuthService.create_refresh_token(user.id)
+    user_id = str(user.id)
+    access_token = AuthService.create_access_token(user_id)
+    refresh_token = AuthService.create_refresh_token(user_id)
     
     return TokenResponse(
         access_token=access_token,
@@ -93,7 +103,7 @@ async def login(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     token_data: TokenRefresh,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using refresh token
@@ -115,7 +125,9 @@ async def refresh_token(
             )
         
         # Verify user exists and is active
-        user = db.query(User).filter(User.id == user_id).first()
+        user = (await db.execute(
+            select(User.id, User.is_active).where(User.id == user_id)
+        )).first()
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,8 +136,9 @@ async def refresh_token(
         
         # Generate new tokens
         settings = get_settings()
-        access_token = AuthService.create_access_token(user.id)
-        new_refresh_token = AuthService.create_refresh_token(user.id)
+        # Reuse the subject string from the refresh token
+        access_token = AuthService.create_access_token(user_id)
+        new_refresh_token = AuthService.create_refresh_token(user_id)
         
         return TokenResponse(
             access_token=access_token,
@@ -157,7 +170,7 @@ async def get_current_user_profile(
 async def update_user_profile(
     update_data: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update current user profile
@@ -165,11 +178,12 @@ async def update_user_profile(
     Currently supports updating consent flags
     """
     if update_data.consent_flags is not None:
-        current_user = AuthService.update_consent_flags(
+        current_user = await AuthService.update_consent_flags(
             db,
             current_user,
             update_data.consent_flags
         )
+        await invalidate_cached_user(current_user.id)
     
     return UserProfile.from_orm(current_user)
 
@@ -178,14 +192,14 @@ async def update_user_profile(
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change user password
     
     Requires current password for verification
     """
-    success = AuthService.change_password(
+    success = await AuthService.change_password(
         db,
         current_user,
         password_data.current_password,
@@ -198,12 +212,15 @@ async def change_password(
             detail="Current password is incorrect"
         )
     
+    await invalidate_cached_user(current_user.id)
+    
     return {"message": "Password changed successfully"}
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     Logout user
@@ -212,6 +229,7 @@ async def logout(
     This endpoint is provided for consistency and future token blacklisting.
     """
     # TODO: Implement token blacklisting if needed
+    await invalidate_cached_token(credentials.credentials)
     logger.info(f"User logged out: {current_user.email}")
     
     return {"message": "Logged out successfully"}
@@ -2,30 +2,49 @@
 Pydantic schemas for authentication
 """
 
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, EmailStr, Field, StringConstraints
+from typing import Annotated, Optional
 from datetime import datetime
 import uuid
+import re
+
+
+# Single-pass strength check: uppercase, lowercase and digit (length is
+# enforced by StringConstraints in pydantic-core). Kept out of the
+# StringConstraints pattern because the Rust regex engine has no lookaheads
+# (the same applies to RE2, so google-re2 is not an option here). Input is
+# capped at 100 chars, so each lookahead is a bounded linear scan.
+_PASSWORD_RE = re.compile(r"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)")
+
+
+def _validate_password_strength(v: str) -> str:
+    """Validate password strength"""
+    if _PASSWORD_RE.match(v):
+        return v
+    
+    # Slow path only on failure, to report which rule was broken
+    if not any(c.isupper() for c in v):
+        raise ValueError("Password must contain at least one uppercase letter")
+    if not any(c.islower() for c in v):
+        raise ValueError("Password must contain at least one lowercase letter")
+    if not any(c.isdigit() for c in v):
+        raise ValueError("Password must contain at least one digit")
+    return v
+
+
+# Reusable password type: length checked in Rust, strength in one regex pass
+Password = Annotated[
+    str,
+    StringConstraints(min_length=8, max_length=100),
+    AfterValidator(_validate_password_strength)
+]
 
 
 class UserRegister(BaseModel):
     """Schema for user registration"""
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=100)
+    password: Password
     consent_flags: Optional[dict] = Field(default_factory=dict)
-    
-    @validator("password")
-    def validate_password(cls, v):
-        """Validate password strength"""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-        if not any(c.islower() for c in v):
-            raise ValueError("Password must contain at least one lowercase letter")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-        return v
 
 
 class UserLogin(BaseModel):
@@ -57,8 +76,7 @@ class UserProfile(BaseModel):
     last_login: Optional[datetime]
     is_active: bool
     
-    class Config:
-        from_attributes = True  # Pydantic v2 (was orm_mode in v1)
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserUpdate(BaseModel):
@@ -69,17 +87,4 @@ class UserUpdate(BaseModel):
 class PasswordChange(BaseModel):
     """Schema for password change"""
     current_password: str
-    new_password: str = Field(..., min_length=8, max_length=100)
-    
-    @validator("new_password")
-    def validate_password(cls, v):
-        """Validate password strength"""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-        if not any(c.islower() for c in v):
-            raise ValueError("Password must contain at least one lowercase letter")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-        return v
+    new_password: Password
@@ -3,21 +3,102 @@ Authentication service with JWT and password hashing
 """
 
 from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from typing import Optional
+from cachetools import TTLCache
+import jwt
+from jwt import PyJWTError
+from jwt.algorithms import HMACAlgorithm
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import DateTime, Row, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Dict, Optional, Tuple, Union
+import asyncio
+import hashlib
+import hmac
+import threading
 import uuid
+import time
 import logging
 
-from db import User, UserRole
+from db import User, UserRole, uuid7
 from app.config import get_settings
 from app.auth.schemas import UserRegister, UserLogin
 
 logger = logging.getLogger(__name__)
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2id is the default scheme; bcrypt is kept so existing hashes still
+# verify and get upgraded transparently on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,  # KiB (~19 MiB)
+    argon2__parallelism=1
+)
+
+# JWT settings resolved once at import instead of on every token operation
+_settings = get_settings()
+_JWT_SECRET = _settings.JWT_SECRET
+_JWT_ALGORITHM = _settings.JWT_ALGORITHM
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+# Every token we issue carries both; reject any that do not
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+_ACCESS_TOKEN_EXPIRE_SECONDS = _settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TOKEN_EXPIRE_SECONDS = _settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
+class _KeyedHMACAlgorithm(HMACAlgorithm):
+    """
+    HMAC JWS algorithm with the server key schedule computed once
+    
+    Signing with the configured secret copies a pre-keyed ``hmac`` object
+    instead of re-deriving the inner/outer pads for every token. Any other
+    key falls back to PyJWT's default implementation.
+    """
+    
+    def __init__(self, hash_alg, key: bytes):
+        super().__init__(hash_alg)
+        self._key = key
+        self._template = hmac.new(key, digestmod=hash_alg)
+    
+    def sign(self, msg: bytes, key: bytes) -> bytes:
+        if key != self._key:
+            return super().sign(msg, key)
+        mac = self._template.copy()
+        mac.update(msg)
+        return mac.digest()
+    
+    def verify(self, msg: bytes, key: bytes, sig: bytes) -> bool:
+        return hmac.compare_digest(sig, self.sign(msg, key))
+
+
+_HMAC_HASHES = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+if _JWT_ALGORITHM in _HMAC_HASHES:
+    jwt.unregister_algorithm(_JWT_ALGORITHM)
+    jwt.register_algorithm(
+        _JWT_ALGORITHM,
+        _KeyedHMACAlgorithm(_HMAC_HASHES[_JWT_ALGORITHM], _JWT_SECRET.encode("utf-8"))
+    )
+
+# Static claims copied into each token payload
+_ACCESS_CLAIMS = {"type": "access"}
+_REFRESH_CLAIMS = {"type": "refresh"}
+
+# Short-lived cache of verified token payloads (see AuthService.decode_token)
+_TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=_TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+# last_login timestamps waiting to be written, keyed by user id. Flushed in
+# one UPDATE ... FROM (VALUES ...) per interval instead of a commit per login.
+_pending_logins: Dict[uuid.UUID, datetime] = {}
 
 
 class AuthService:
@@ -25,7 +106,7 @@ class AuthService:
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a password using bcrypt"""
+        """Hash a password using argon2id"""
         return pwd_context.hash(password)
     
     @staticmethod
@@ -34,107 +115,153 @@ class AuthService:
         return pwd_context.verify(plain_password, hashed_password)
     
     @staticmethod
-    def create_access_token(user_id: uuid.UUID, expires_delta: Optional[timedelta] = None) -> str:
+    def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and return a replacement hash if the stored one
+        uses a deprecated scheme (e.g. legacy bcrypt)
+        """
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    
+    @staticmethod
+    def create_access_token(user_id: Union[uuid.UUID, str], expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
-        settings = get_settings()
-        
         if expires_delta is None:
-            expires_delta = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+            expires_in = _ACCESS_TOKEN_EXPIRE_SECONDS
+        else:
+            expires_in = int(expires_delta.total_seconds())
         
-        expire = datetime.utcnow() + expires_delta
+        # NumericDate claims as plain ints (RFC 7519), no datetime round trip
+        now = int(time.time())
         
-        to_encode = {
-            "sub": str(user_id),
-            "exp": expire,
-            "type": "access"
-        }
+        to_encode = _ACCESS_CLAIMS.copy()
+        to_encode["sub"] = user_id if isinstance(user_id, str) else str(user_id)
+        to_encode["iat"] = now
+        to_encode["exp"] = now + expires_in
         
         encoded_jwt = jwt.encode(
             to_encode,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
+            _JWT_SECRET,
+            algorithm=_JWT_ALGORITHM
         )
         
         return encoded_jwt
     
     @staticmethod
-    def create_refresh_token(user_id: uuid.UUID, expires_delta: Optional[timedelta] = None) -> str:
+    def create_refresh_token(user_id: Union[uuid.UUID, str], expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT refresh token"""
-        settings = get_settings()
-        
         if expires_delta is None:
-            expires_delta = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+            expires_in = _REFRESH_TOKEN_EXPIRE_SECONDS
+        else:
+            expires_in = int(expires_delta.total_seconds())
         
-        expire = datetime.utcnow() + expires_delta
+        # NumericDate claims as plain ints (RFC 7519), no datetime round trip
+        now = int(time.time())
         
-        to_encode = {
-            "sub": str(user_id),
-            "exp": expire,
-            "type": "refresh"
-        }
+        to_encode = _REFRESH_CLAIMS.copy()
+        to_encode["sub"] = user_id if isinstance(user_id, str) else str(user_id)
+        to_encode["iat"] = now
+        to_encode["exp"] = now + expires_in
         
         encoded_jwt = jwt.encode(
             to_encode,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
+            _JWT_SECRET,
+            algorithm=_JWT_ALGORITHM
         )
         
         return encoded_jwt
     
     @staticmethod
     def decode_token(token: str) -> dict:
-        """Decode and validate a JWT token"""
-        settings = get_settings()
+        """
+        Decode and validate a JWT token
+        
+        Verified payloads are cached briefly by token string so repeated
+        requests with the same bearer token skip the HMAC check. A token is
+        only cached if it stays valid for the whole cache TTL.
+        """
+        with _token_cache_lock:
+            payload = _token_cache.get(token)
+        if payload is not None:
+            return payload
         
         try:
             payload = jwt.decode(
                 token,
-                settings.JWT_SECRET,
-                algorithms=[settings.JWT_ALGORITHM]
+                _JWT_SECRET,
+                algorithms=_JWT_ALGORITHMS,
+                options=_JWT_DECODE_OPTIONS
             )
-            return payload
-        except JWTError as e:
+        except PyJWTError as e:
             logger.error(f"JWT decode error: {str(e)}")
             raise
+        
+        if payload.get("exp", 0) - time.time() > _TOKEN_CACHE_TTL_SECONDS:
+            with _token_cache_lock:
+                _token_cache[token] = payload
+        
+        return payload
     
     @staticmethod
-    def register_user(db: Session, user_data: UserRegister) -> User:
-        """Register a new user"""
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
-            raise ValueError("Email already registered")
+    async def register_user(db: AsyncSession, user_data: UserRegister) -> Row:
+        """
+        Register a new user
         
-        # Create new user
-        hashed_password = AuthService.hash_password(user_data.password)
+        Uses a single ``INSERT ... ON CONFLICT (email) DO NOTHING RETURNING id``
+        so the uniqueness check is atomic and costs one round trip.
+        """
+        # Password hashing is CPU-bound; keep it off the event loop
+        hashed_password = await asyncio.to_thread(AuthService.hash_password, user_data.password)
         
-        new_user = User(
-            id=uuid.uuid4(),
-            email=user_data.email,
-            password_hash=hashed_password,
-            role=UserRole.USER,
-            consent_flags=user_data.consent_flags or {},
-            is_active=True
+        stmt = (
+            pg_insert(User)
+            .values(
+                id=uuid7(),
+                email=user_data.email,
+                password_hash=hashed_password,
+                role=UserRole.USER,
+                consent_flags=user_data.consent_flags or {},
+                is_active=True
+            )
+            # Infers ix_users_email_covering, the only unique index on email
+            # (ON CONFLICT ON CONSTRAINT cannot name a plain unique index)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id)
         )
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        new_user = (await db.execute(stmt)).first()
+        if new_user is None:
+            await db.rollback()
+            raise ValueError("Email already registered")
+        
+        await db.commit()
         
         logger.info(f"New user registered: {user_data.email}")
         
         return new_user
     
     @staticmethod
-    def authenticate_user(db: Session, login_data: UserLogin) -> Optional[User]:
-        """Authenticate a user with email and password"""
-        user = db.query(User).filter(User.email == login_data.email).first()
+    async def authenticate_user(db: AsyncSession, login_data: UserLogin) -> Optional[Row]:
+        """
+        Authenticate a user with email and password
+        
+        Only the columns needed for login are fetched; the returned row
+        exposes ``id``, ``password_hash`` and ``is_active``.
+        """
+        user = (await db.execute(
+            select(User.id, User.password_hash, User.is_active)
+            .where(User.email == login_data.email)
+        )).first()
         
         if not user:
             logger.warning(f"Login attempt for non-existent user: {login_data.email}")
             return None
         
-        if not AuthService.verify_password(login_data.password, user.password_hash):
+        verified, new_hash = await asyncio.to_thread(
+            AuthService.verify_and_update_password,
+            login_data.password,
+            user.password_hash
+        )
+        if not verified:
             logger.warning(f"Failed login attempt for user: {login_data.email}")
             return None
         
@@ -142,34 +269,109 @@ class AuthService:
             logger.warning(f"Login attempt for inactive user: {login_data.email}")
             return None
         
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.commit()
+        # Rehash legacy bcrypt hashes with the current scheme
+        if new_hash:
+            await db.execute(
+                update(User).where(User.id == user.id).values(password_hash=new_hash)
+            )
+            await db.commit()
+        
+        # last_login is written in batches by flush_login_updates
+        AuthService.record_login(user.id)
         
         logger.info(f"User authenticated successfully: {login_data.email}")
         
         return user
     
     @staticmethod
-    def change_password(db: Session, user: User, current_password: str, new_password: str) -> bool:
+    def record_login(user_id: uuid.UUID) -> None:
+        """Queue a last_login update for the next batch flush"""
+        _pending_logins[user_id] = datetime.now(timezone.utc)
+    
+    @staticmethod
+    async def flush_login_updates(session_factory: async_sessionmaker) -> int:
+        """
+        Write all queued last_login timestamps in a single UPDATE
+        
+        Returns:
+            Number of users updated
+        """
+        if not _pending_logins:
+            return 0
+        
+        pending = list(_pending_logins.items())
+        _pending_logins.clear()
+        
+        logins = values(
+            column("id", UUID(as_uuid=True)),
+            column("ts", DateTime(timezone=True)),
+            name="logins"
+        ).data(pending)
+        
+        stmt = (
+            update(User)
+            .where(User.id == logins.c.id)
+            .values(last_login=logins.c.ts)
+        )
+        
+        try:
+            async with session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception:
+            # Put the timestamps back unless a newer login superseded them
+            for user_id, ts in pending:
+                _pending_logins.setdefault(user_id, ts)
+            raise
+        
+        return len(pending)
+    
+    @staticmethod
+    async def run_login_flush_loop(session_factory: async_sessionmaker, interval: float) -> None:
+        """Background task flushing queued last_login updates every ``interval`` seconds"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await AuthService.flush_login_updates(session_factory)
+                except Exception as e:
+                    logger.error(f"Error flushing last_login updates: {str(e)}")
+        finally:
+            # Final flush on shutdown so no logins are lost
+            try:
+                await AuthService.flush_login_updates(session_factory)
+            except Exception as e:
+                logger.error(f"Error flushing last_login updates on shutdown: {str(e)}")
+    
+    @staticmethod
+    async def change_password(db: AsyncSession, user: User, current_password: str, new_password: str) -> bool:
         """Change user password"""
-        if not AuthService.verify_password(current_password, user.password_hash):
+        # The request's user may come from the auth cache, which does not
+        # hold the password hash
+        password_hash = (await db.execute(
+            select(User.password_hash).where(User.id == user.id)
+        )).scalar_one()
+        verified = await asyncio.to_thread(
+            AuthService.verify_password, current_password, password_hash
+        )
+        if not verified:
             logger.warning(f"Failed password change attempt for user: {user.email}")
             return False
         
-        user.password_hash = AuthService.hash_password(new_password)
-        db.commit()
+        new_hash = await asyncio.to_thread(AuthService.hash_password, new_password)
+        await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
         
         logger.info(f"Password changed for user: {user.email}")
         
         return True
     
     @staticmethod
-    def update_consent_flags(db: Session, user: User, consent_flags: dict) -> User:
+    async def update_consent_flags(db: AsyncSession, user: User, consent_flags: dict) -> User:
         """Update user consent flags"""
+        await db.execute(update(User).where(User.id == user.id).values(consent_flags=consent_flags))
+        await db.commit()
         user.consent_flags = consent_flags
-        db.commit()
-        db.refresh(user)
         
         logger.info(f"Consent flags updated for user: {user.email}")
         
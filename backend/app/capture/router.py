@@ -2,34 +2,86 @@
 Capture router with endpoints for upload, status, and results
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import uuid
-import json
+import orjson
 import logging
 
-from db import get_db, User
+from db import get_async_db, User
 from app.dependencies import get_current_active_user
 from app.capture.schemas import (
     CaptureResponse,
     CaptureStatusResponse,
     CaptureResultsResponse,
     CaptureUploadMetadata,
+    UploadModeEnum,
+    PresignRequest,
+    PresignResponse,
     MetricsOnlyUpload,
     MetricsAdjustment,
     AdjustmentApproval,
     AdjustmentHistoryResponse
 )
-from app.capture.service import CaptureService
+from app.capture.service import CaptureService, PRESIGNED_UPLOAD_EXPIRES
+from app.storage import get_redis_cache
+from app.storage.redis_client import (
+    idempotency_cache_key, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_PENDING_TTL_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.post("", response_model=CaptureResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/presign", response_model=PresignResponse, status_code=status.HTTP_201_CREATED)
+async def presign_capture_upload(
+    request: PresignRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get presigned URLs to upload capture images directly to storage
+    
+    The client PUTs each image to its URL, then POSTs `/captures` with
+    metadata `upload_mode="presigned"`, the `capture_id` and the
+    `object_keys` returned here. Image bytes never pass through the API.
+    """
+    try:
+        capture, object_keys, urls = await CaptureService.create_presigned_capture(
+            db, current_user, request
+        )
+        
+        return PresignResponse(
+            capture_id=capture.id,
+            urls=urls,
+            object_keys=object_keys,
+            expires_in=int(PRESIGNED_UPLOAD_EXPIRES.total_seconds())
+        )
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post(
+    "",
+    response_model=CaptureResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": CaptureResponse,
+            "description": "Images received (multipart or presigned); storage and processing are queued"
+        }
+    }
+)
 async def upload_capture(
+    response: Response,
+    
     # Image files (optional for metrics-only upload)
     front: Optional[UploadFile] = File(None),
     side: Optional[UploadFile] = File(None),
@@ -40,9 +92,12 @@ async def upload_capture(
     metadata: Optional[str] = Form(None),
     metrics: Optional[str] = Form(None),
     
+    # Client-chosen key so retried uploads are not processed twice
+    idempotency_key: Optional[str] = Header(None),
+    
     # Dependencies
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload capture - supports two modes:
@@ -55,21 +110,90 @@ async def upload_capture(
     2. **Metrics-Only**: Upload pre-computed metrics from client-side processing
        - Requires: metrics JSON with body measurements
        - Optional: skin, shape, quality metrics
+    
+    Metrics-only uploads return 201; image and presigned uploads return
+    202 since storage and processing happen in the workers.
+    
+    Retries sending the same `Idempotency-Key` header within an hour get
+    the original response back instead of creating another capture.
     """
+    if not idempotency_key:
+        return await _create_capture(
+            response, front, side, portrait, reference,
+            metadata, metrics, current_user, db
+        )
+    
+    cache = get_redis_cache()
+    key = idempotency_cache_key(current_user.id, idempotency_key)
+    
+    claimed, stored = await cache.claim_idempotency_key(key, IDEMPOTENCY_PENDING_TTL_SECONDS)
+    if not claimed:
+        if stored is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        return JSONResponse(status_code=stored['status_code'], content=stored['body'])
+    
+    try:
+        result = await _create_capture(
+            response, front, side, portrait, reference,
+            metadata, metrics, current_user, db
+        )
+    except BaseException:
+        # Let the client retry a request that did not go through, including
+        # one cancelled by a client disconnect
+        await cache.delete(key)
+        raise
+    
+    # Replaces the pending placeholder, with the full replay window
+    await cache.set_json(key, {
+        'status_code': response.status_code or status.HTTP_201_CREATED,
+        'body': result.model_dump(mode='json')
+    }, IDEMPOTENCY_TTL_SECONDS)
+    
+    return result
+
+
+async def _create_capture(
+    response: Response,
+    front: Optional[UploadFile],
+    side: Optional[UploadFile],
+    portrait: Optional[UploadFile],
+    reference: Optional[UploadFile],
+    metadata: Optional[str],
+    metrics: Optional[str],
+    current_user: User,
+    db: AsyncSession
+) -> CaptureResponse:
+    """Create a capture from either uploaded images or metrics"""
     
     try:
         # Parse metadata if provided
         upload_metadata = None
         if metadata:
-            metadata_dict = json.loads(metadata)
+            metadata_dict = orjson.loads(metadata)
             upload_metadata = CaptureUploadMetadata(**metadata_dict)
         
+        # Presigned mode: images were PUT to storage directly
+        if upload_metadata and upload_metadata.upload_mode == UploadModeEnum.PRESIGNED:
+            capture = await CaptureService.complete_presigned_capture(
+                db, current_user, upload_metadata
+            )
+            
+            response.status_code = status.HTTP_202_ACCEPTED
+            return CaptureResponse(
+                capture_id=capture.id,
+                status=capture.status,
+                message="Uploads received. Processing queued."
+            )
+        
         # Mode 1: Metrics-only upload (client-side processing)
-        if metrics and not any([front, side, portrait]):
-            metrics_dict = json.loads(metrics)
+        elif metrics and not any([front, side, portrait]):
+            metrics_dict = orjson.loads(metrics)
             metrics_data = MetricsOnlyUpload(**metrics_dict)
             
-            capture = CaptureService.create_capture_from_metrics(
+            capture = await CaptureService.create_capture_from_metrics(
                 db, current_user, metrics_data
             )
             
@@ -91,15 +215,17 @@ async def upload_capture(
                     detail="Front and side images are required"
                 )
             
-            capture = CaptureService.create_capture_from_images(
+            capture = await CaptureService.create_capture_from_images(
                 db, current_user, upload_metadata,
                 front, side, portrait, reference
             )
             
+            # Images are stored and processed asynchronously
+            response.status_code = status.HTTP_202_ACCEPTED
             return CaptureResponse(
                 capture_id=capture.id,
                 status=capture.status,
-                message="Images uploaded successfully. Processing queued.",
+                message="Images received. Upload and processing queued.",
                 queue_position=None  # TODO: Get actual queue position
             )
         
@@ -126,7 +252,7 @@ async def upload_capture(
 async def get_capture_status(
     capture_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get processing status of a capture
@@ -134,18 +260,18 @@ async def get_capture_status(
     Returns current status, queue position, and progress information
     """
     try:
-        capture = CaptureService.get_capture_status(db, capture_id, current_user)
+        capture = await CaptureService.get_capture_status(db, capture_id, current_user)
         
         return CaptureStatusResponse(
-            capture_id=capture.id,
-            status=capture.status,
+            capture_id=capture['capture_id'],
+            status=capture['status'],
             queue_position=None,  # TODO: Calculate from queue
             progress=None,  # TODO: Get from worker
             current_stage=None,  # TODO: Get from worker
-            error_message=capture.error_message,
-            created_at=capture.created_at,
-            processing_started_at=capture.processing_started_at,
-            processing_completed_at=capture.processing_completed_at
+            error_message=capture['error_message'],
+            created_at=capture['created_at'],
+            processing_started_at=capture['processing_started_at'],
+            processing_completed_at=capture['processing_completed_at']
         )
     
     except ValueError as e:
@@ -159,7 +285,7 @@ async def get_capture_status(
 async def get_capture_results(
     capture_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get final results of a completed capture
@@ -167,7 +293,7 @@ async def get_capture_results(
     Returns all metrics, skin analysis, shape classification, and quality scores
     """
     try:
-        results = CaptureService.get_capture_results(db, capture_id, current_user)
+        results = await CaptureService.get_cached_capture_results(db, capture_id, current_user)
         return CaptureResultsResponse(**results)
     
     except ValueError as e:
@@ -182,7 +308,7 @@ async def submit_metrics_adjustment(
     capture_id: uuid.UUID,
     adjustment: MetricsAdjustment,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit user adjustments to metrics
@@ -190,7 +316,7 @@ async def submit_metrics_adjustment(
     Allows users to correct or refine measurements
     """
     try:
-        adjustment_record = CaptureService.submit_adjustment(
+        adjustment_record = await CaptureService.submit_adjustment(
             db, capture_id, current_user, adjustment
         )
         
@@ -211,7 +337,7 @@ async def submit_metrics_adjustment(
 async def get_metrics_history(
     capture_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get complete adjustment history for a capture
@@ -219,7 +345,7 @@ async def get_metrics_history(
     Shows original metrics and all user adjustments
     """
     try:
-        history = CaptureService.get_adjustment_history(db, capture_id, current_user)
+        history = await CaptureService.get_adjustment_history(db, capture_id, current_user)
         return AdjustmentHistoryResponse(**history)
     
     except ValueError as e:
@@ -234,7 +360,7 @@ async def approve_adjustment(
     capture_id: uuid.UUID,
     approval: AdjustmentApproval,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Approve or reject a user adjustment (Admin/Tailor only)
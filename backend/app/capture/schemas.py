@@ -2,7 +2,7 @@
 Pydantic schemas for capture upload and results
 """
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, List
 from datetime import datetime
 from enum import Enum
@@ -14,7 +14,20 @@ class CaptureSourceEnum(str, Enum):
     MOBILE = "mobile"
 
 
+class CaptureImageEnum(str, Enum):
+    FRONT = "front"
+    SIDE = "side"
+    PORTRAIT = "portrait"
+    REFERENCE = "reference"
+
+
+class UploadModeEnum(str, Enum):
+    DIRECT = "direct"  # images sent in the multipart request
+    PRESIGNED = "presigned"  # images PUT straight to MinIO beforehand
+
+
 class CaptureStatusEnum(str, Enum):
+    UPLOADING = "uploading"
     QUEUED = "queued"
     PROCESSING = "processing"
     DONE = "done"
@@ -64,6 +77,19 @@ class CaptureUploadMetadata(BaseModel):
     source: CaptureSourceEnum = CaptureSourceEnum.WEB
     store_images: bool = False
     device_info: Optional[Dict] = None
+    upload_mode: UploadModeEnum = UploadModeEnum.DIRECT
+    # Presigned mode only: capture from /captures/presign and the object
+    # keys the images were uploaded to
+    capture_id: Optional[uuid.UUID] = None
+    object_keys: Optional[Dict[CaptureImageEnum, str]] = None
+
+
+class PresignRequest(BaseModel):
+    """Request presigned upload URLs for a new capture"""
+    images: List[CaptureImageEnum] = Field(
+        default_factory=lambda: [CaptureImageEnum.FRONT, CaptureImageEnum.SIDE, CaptureImageEnum.PORTRAIT]
+    )
+    source: CaptureSourceEnum = CaptureSourceEnum.WEB
 
 
 class MetricsOnlyUpload(BaseModel):
@@ -84,6 +110,14 @@ class CaptureResponse(BaseModel):
     queue_position: Optional[int] = None
 
 
+class PresignResponse(BaseModel):
+    """Presigned PUT URLs for uploading capture images directly to storage"""
+    capture_id: uuid.UUID
+    urls: Dict[CaptureImageEnum, str]
+    object_keys: Dict[CaptureImageEnum, str]
+    expires_in: int  # seconds
+
+
 class CaptureStatusResponse(BaseModel):
     """Response for status check"""
     capture_id: uuid.UUID
@@ -109,8 +143,7 @@ class CaptureResultsResponse(BaseModel):
     model_versions: Dict[str, str] = Field(default_factory=dict)
     has_adjustments: bool = False
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # User adjustment schemas
@@ -140,8 +173,7 @@ class AdjustmentHistoryItem(BaseModel):
     approved_at: Optional[datetime]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AdjustmentHistoryResponse(BaseModel):
@@ -2,34 +2,239 @@
 Capture service with business logic for upload and processing
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, case, exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import UploadFile
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import BinaryIO, Optional, List, Dict, Tuple
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uuid
 import logging
+import os
+import tempfile
+import aiofiles
+import aiofiles.os
 from PIL import Image
 import io
+import re
 
 from db import (
     Capture, CaptureMetrics, Artifact, UserAdjustment,
     CaptureStatus, CaptureSource, ArtifactType, AdjustmentSource, User
 )
 from app.capture.schemas import (
-    CaptureUploadMetadata, MetricsOnlyUpload,
+    CaptureUploadMetadata, MetricsOnlyUpload, PresignRequest,
     BodyMetrics, MetricsAdjustment
 )
-from app.storage import get_minio_client
+from app.storage import get_minio_client, get_redis_cache
+from app.storage.redis_client import (
+    capture_status_key, capture_results_key, dashboard_stats_key,
+    CAPTURE_STATUS_TTL_SECONDS, CAPTURE_RESULTS_TTL_SECONDS,
+    USER_METRICS_REFRESH_KEY, USER_METRICS_REFRESH_TTL_SECONDS,
+    USER_METRICS_REFRESH_DELAY_SECONDS
+)
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Uploads are read in 64 KiB chunks and kept in memory up to 1 MiB before
+# spilling to a temporary file
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Lifetime of presigned PUT URLs handed to clients
+PRESIGNED_UPLOAD_EXPIRES = timedelta(minutes=10)
+
+_JPEG_SOI = b"\xff\xd8\xff"
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG APPn segments kept for decoding, by identifier prefix: APP0 JFIF,
+# APP2 ICC profile and APP14 Adobe. Every other APPn (EXIF/XMP, MPF, IPTC,
+# vendor blocks) and COM is dropped; APP1 is kept only for benign EXIF.
+_JPEG_KEPT_APP_SEGMENTS = {
+    0xE0: b"JFIF\x00",
+    0xE2: b"ICC_PROFILE\x00",
+    0xEE: b"Adobe",
+}
+_JPEG_COM = 0xFE
+
+# First marker inside entropy-coded data: 0xFF followed by anything but a
+# stuffed zero, a restart marker or a fill byte
+_JPEG_SCAN_MARKER = re.compile(rb"\xff[\x01-\xcf\xd8-\xfe]")
+
+# IFD0 tags that carry no PII. An EXIF block holding only these (no Exif
+# sub-IFD, no GPS, no thumbnail) is kept so Orientation survives.
+_BENIGN_EXIF_TAGS = {
+    0x0112,  # Orientation
+    0x011A,  # XResolution
+    0x011B,  # YResolution
+    0x0128,  # ResolutionUnit
+    0x0213,  # YCbCrPositioning
+}
+
+# PNG ancillary chunks carrying metadata
+_PNG_METADATA_CHUNKS = {b"tEXt", b"iTXt", b"zTXt", b"eXIf", b"tIME"}
+
+
+def _is_benign_exif(payload: bytes) -> bool:
+    """True if an APP1 payload is EXIF with only benign IFD0 tags"""
+    if payload[:6] != b"Exif\x00\x00":
+        return False
+    
+    tiff = payload[6:]
+    if tiff[:2] == b"II":
+        order = "little"
+    elif tiff[:2] == b"MM":
+        order = "big"
+    else:
+        return False
+    
+    ifd0 = int.from_bytes(tiff[4:8], order)
+    if ifd0 + 2 > len(tiff):
+        return False
+    count = int.from_bytes(tiff[ifd0:ifd0 + 2], order)
+    entries_end = ifd0 + 2 + count * 12
+    if entries_end + 4 > len(tiff):
+        return False
+    
+    for i in range(count):
+        entry = ifd0 + 2 + i * 12
+        if int.from_bytes(tiff[entry:entry + 2], order) not in _BENIGN_EXIF_TAGS:
+            return False
+    
+    # A non-zero next-IFD offset means an IFD1 thumbnail follows
+    return int.from_bytes(tiff[entries_end:entries_end + 4], order) == 0
+
+
+def _keep_spans(data: bytes, drop: List[Tuple[int, int]], end: int) -> bytes:
+    """Return data[:end] without the given (start, end) spans; no copy if unchanged"""
+    if not drop and end == len(data):
+        return data
+    
+    parts = []
+    pos = 0
+    for span_start, span_end in drop:
+        parts.append(data[pos:span_start])
+        pos = span_end
+    parts.append(data[pos:end])
+    return b"".join(parts)
+
+
+def _is_kept_jpeg_segment(marker: int, payload: bytes) -> bool:
+    """True if an APPn/COM segment is needed for decoding and carries no PII"""
+    if marker == 0xE1:
+        return _is_benign_exif(payload)
+    prefix = _JPEG_KEPT_APP_SEGMENTS.get(marker)
+    return prefix is not None and payload.startswith(prefix)
+
+
+def _strip_jpeg_metadata(data: bytes) -> bytes:
+    """
+    Drop metadata segments from a JPEG without decoding it
+    
+    The output ends at EOI: anything appended after the image (MPF
+    secondary images, vendor trailers) is cut, since it can carry its own
+    EXIF. Raises ValueError if the stream is malformed or has no EOI.
+    """
+    drop: List[Tuple[int, int]] = []
+    pos = 2  # after SOI
+    size = len(data)
+    
+    while pos < size:
+        if data[pos] != 0xFF:
+            raise ValueError(f"Invalid JPEG marker at offset {pos}")
+        if pos + 1 >= size:
+            raise ValueError("Truncated JPEG marker")
+        marker = data[pos + 1]
+        
+        # Fill bytes and standalone markers (TEM, RSTn) carry no length
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if marker == 0xD9:
+            return _keep_spans(data, drop, pos + 2)
+        
+        if pos + 4 > size:
+            raise ValueError("Truncated JPEG segment header")
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        end = pos + 2 + length
+        if length < 2 or end > size:
+            raise ValueError(f"Invalid JPEG segment length at offset {pos}")
+        
+        if (0xE0 <= marker <= 0xEF or marker == _JPEG_COM) and \
+                not _is_kept_jpeg_segment(marker, data[pos + 4:end]):
+            drop.append((pos, end))
+        pos = end
+        
+        # SOS is followed by entropy-coded data; skip to the next marker
+        # (DHT/SOS of the next progressive scan, or EOI)
+        if marker == 0xDA:
+            match = _JPEG_SCAN_MARKER.search(data, pos)
+            if match is None:
+                break
+            pos = match.start()
+    
+    raise ValueError("JPEG has no EOI marker")
+
+
+def _strip_png_metadata(data: bytes) -> bytes:
+    """
+    Drop text/EXIF chunks from a PNG without decoding it
+    
+    The output ends at IEND; trailing data is cut. Raises ValueError if
+    the stream is truncated or has no IEND.
+    """
+    drop: List[Tuple[int, int]] = []
+    pos = 8  # after signature
+    size = len(data)
+    
+    while pos < size:
+        if pos + 8 > size:
+            raise ValueError("Truncated PNG chunk header")
+        length = int.from_bytes(data[pos:pos + 4], "big")
+        chunk_type = data[pos + 4:pos + 8]
+        end = pos + 12 + length  # length + type + data + crc
+        if end > size:
+            raise ValueError(f"Truncated PNG chunk {chunk_type!r}")
+        
+        if chunk_type in _PNG_METADATA_CHUNKS:
+            drop.append((pos, end))
+        pos = end
+        
+        if chunk_type == b"IEND":
+            return _keep_spans(data, drop, end)
+    
+    raise ValueError("PNG has no IEND chunk")
+
 
 class CaptureService:
     """Service for capture operations"""
     
     @staticmethod
     def strip_exif(image_bytes: bytes) -> bytes:
-        """Strip EXIF metadata from image"""
+        """
+        Strip EXIF and other text metadata from an image
+        
+        JPEG and PNG are handled at the container level (metadata segments
+        and chunks are dropped, pixel data is copied untouched, anything
+        after EOI/IEND is cut). Files with nothing to strip, including EXIF
+        holding only Orientation-style tags, are returned as-is. Other
+        formats, and JPEG/PNG streams the parser cannot follow, fall back
+        to a Pillow re-encode.
+        """
+        try:
+            if image_bytes[:3] == _JPEG_SOI:
+                return _strip_jpeg_metadata(image_bytes)
+            if image_bytes[:8] == _PNG_SIGNATURE:
+                return _strip_png_metadata(image_bytes)
+        except ValueError as e:
+            logger.warning(f"Could not strip metadata in place, re-encoding: {str(e)}")
+        
         try:
             image = Image.open(io.BytesIO(image_bytes))
             
@@ -49,34 +254,284 @@ class CaptureService:
             return image_bytes
     
     @staticmethod
-    def validate_image(file: UploadFile) -> bool:
-        """Validate uploaded image"""
-        # Check file size (max 50MB)
-        MAX_SIZE = 50 * 1024 * 1024
+    async def spool_upload(file: UploadFile, max_size: int) -> Tuple[BinaryIO, int]:
+        """
+        Stream an upload into a spooled temporary file
+        
+        The size limit is enforced chunk by chunk; small images stay in
+        memory and large ones spill to disk, so an upload is never buffered
+        in full just to be validated.
+        
+        Returns:
+            (spooled file positioned at 0, size in bytes)
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
+        total = 0
+        
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_size:
+                    raise ValueError(f"File too large: more than {max_size} bytes")
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        
+        spool.seek(0)
+        return spool, total
+    
+    @staticmethod
+    async def validate_image(file: UploadFile) -> Tuple[BinaryIO, int]:
+        """
+        Validate uploaded image
+        
+        Returns:
+            (spooled image file positioned at 0, size in bytes)
+        """
+        max_size = get_settings().MAX_UPLOAD_SIZE_MB * 1024 * 1024
         
         # Check content type
         allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
         if file.content_type not in allowed_types:
             raise ValueError(f"Invalid file type: {file.content_type}")
         
-        # Read file
-        contents = file.file.read()
-        file.file.seek(0)  # Reset file pointer
-        
-        if len(contents) > MAX_SIZE:
-            raise ValueError(f"File too large: {len(contents)} bytes")
+        spool, size = await CaptureService.spool_upload(file, max_size)
         
-        # Validate it's actually an image
+        # Validate it's actually an image (Pillow only parses the header here,
+        # but large uploads have spilled to disk so keep it off the event loop)
         try:
-            Image.open(io.BytesIO(contents))
+            await asyncio.to_thread(Image.open, spool)
         except Exception as e:
+            spool.close()
             raise ValueError(f"Invalid image file: {str(e)}")
         
-        return True
+        spool.seek(0)
+        return spool, size
+    
+    @staticmethod
+    def spool_dir(capture_id) -> str:
+        """Directory holding a capture's uploads until the upload worker stores them"""
+        return os.path.join(get_settings().UPLOAD_SPOOL_DIR, str(capture_id))
+    
+    @staticmethod
+    async def persist_spools(capture_id, spooled: Dict[str, BinaryIO]) -> Dict[str, str]:
+        """
+        Copy validated uploads to the shared spool directory
+        
+        Args:
+            capture_id: Capture the images belong to
+            spooled: Image name -> validated upload
+        
+        Returns:
+            Image name -> path on disk
+        """
+        capture_dir = CaptureService.spool_dir(capture_id)
+        await aiofiles.os.makedirs(capture_dir, exist_ok=True)
+        
+        paths = {}
+        for name, spool in spooled.items():
+            path = os.path.join(capture_dir, f"{name}.bin")
+            async with aiofiles.open(path, 'wb') as out:
+                while chunk := await asyncio.to_thread(spool.read, UPLOAD_CHUNK_SIZE):
+                    await out.write(chunk)
+            paths[name] = path
+        
+        return paths
+    
+    @staticmethod
+    def store_raw_images(
+        capture_id: uuid.UUID,
+        spool_paths: Optional[Dict[str, str]] = None,
+        object_keys: Optional[Dict[str, str]] = None
+    ) -> List[Artifact]:
+        """
+        Strip EXIF from uploaded images, store them in MinIO and build Artifact rows
+        
+        Runs in the upload worker. Images are read either from the spool
+        directory (multipart uploads) or from their presigned object keys.
+        Uploads go out concurrently since the MinIO client is blocking. No
+        database session is needed: the caller adds the returned artifacts
+        and commits in one short transaction, then cleans up the sources.
+        
+        Args:
+            capture_id: Capture the images belong to
+            spool_paths: Image name -> spooled file path
+            object_keys: Image name -> presigned upload object key
+        """
+        minio_client = get_minio_client()
+        sources = spool_paths or object_keys or {}
+        
+        def upload_one(name: str, source: str) -> Artifact:
+            if spool_paths:
+                with open(source, 'rb') as f:
+                    raw_contents = f.read()
+            else:
+                raw_contents = minio_client.download_file('raw', source)
+            clean_contents = CaptureService.strip_exif(raw_contents)
+            
+            object_name = f"{capture_id}/{name}.jpg"
+            bucket_path = minio_client.upload_bytes(
+                'raw',
+                object_name,
+                clean_contents,
+                content_type='image/jpeg'
+            )
+            
+            return Artifact(
+                id=uuid.uuid4(),
+                capture_id=capture_id,
+                bucket_path=bucket_path,
+                artifact_type=ArtifactType.RAW,
+                file_size_bytes=len(clean_contents),
+                content_type='image/jpeg'
+            )
+        
+        with ThreadPoolExecutor(max_workers=max(len(sources), 1)) as pool:
+            return list(pool.map(upload_one, sources.keys(), sources.values()))
+    
+    @staticmethod
+    async def schedule_user_metrics_refresh():
+        """Queue a mv_user_metrics refresh unless one is already pending"""
+        scheduled = await get_redis_cache().set_if_absent(
+            USER_METRICS_REFRESH_KEY, USER_METRICS_REFRESH_TTL_SECONDS
+        )
+        if scheduled:
+            from backend.worker.tasks import refresh_user_metrics_view
+            refresh_user_metrics_view.apply_async(countdown=USER_METRICS_REFRESH_DELAY_SECONDS)
+    
+    @staticmethod
+    def presigned_object_key(capture_id, name: str) -> str:
+        """Staging key a presigned image is PUT to, before EXIF stripping"""
+        return f"incoming/{capture_id}/{name}.jpg"
+    
+    @staticmethod
+    async def create_presigned_capture(
+        db: AsyncSession,
+        user: User,
+        request: PresignRequest
+    ) -> Tuple[Capture, Dict[str, str], Dict[str, str]]:
+        """
+        Create a capture awaiting direct-to-storage uploads
+        
+        Returns:
+            (capture, image name -> object key, image name -> presigned PUT URL)
+        """
+        names = [image.value for image in request.images]
+        if 'front' not in names or 'side' not in names:
+            raise ValueError("Front and side images are required")
+        
+        capture = Capture(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            status=CaptureStatus.UPLOADING,
+            source=CaptureSource(request.source.value),
+            store_images=True
+        )
+        
+        object_keys = {
+            name: CaptureService.presigned_object_key(capture.id, name)
+            for name in names
+        }
+        
+        # Signing is offline (fixed region), but the first get_minio_client()
+        # call checks the buckets over the network; keep both off the loop
+        def sign_urls() -> Dict[str, str]:
+            minio_client = get_minio_client()
+            return {
+                name: minio_client.get_presigned_put_url('raw', key, expires=PRESIGNED_UPLOAD_EXPIRES)
+                for name, key in object_keys.items()
+            }
+        
+        urls = await asyncio.to_thread(sign_urls)
+        
+        db.add(capture)
+        await db.commit()
+        
+        await get_redis_cache().delete(dashboard_stats_key(user.id))
+        
+        logger.info(f"Created presigned capture {capture.id} for user {user.email}")
+        
+        return capture, object_keys, urls
     
     @staticmethod
-    def create_capture_from_images(
-        db: Session,
+    async def complete_presigned_capture(
+        db: AsyncSession,
+        user: User,
+        metadata: CaptureUploadMetadata
+    ) -> Capture:
+        """
+        Queue storage of images the client uploaded with presigned URLs
+        
+        Verifies the capture is the user's and still awaiting uploads, that
+        the keys are the ones handed out, and that every object exists and
+        is within the size limit, then moves it from UPLOADING to QUEUED in
+        one conditional UPDATE so only one completion request queues it.
+        """
+        if not metadata.capture_id or not metadata.object_keys:
+            raise ValueError("capture_id and object_keys are required for presigned uploads")
+        
+        capture = (await db.execute(
+            select(Capture).where(
+                Capture.id == metadata.capture_id,
+                Capture.user_id == user.id
+            )
+        )).scalar_one_or_none()
+        
+        if not capture:
+            raise ValueError("Capture not found")
+        
+        if capture.status != CaptureStatus.UPLOADING:
+            raise ValueError(f"Capture is not awaiting uploads. Current status: {capture.status.value}")
+        
+        object_keys = {name.value: key for name, key in metadata.object_keys.items()}
+        if 'front' not in object_keys or 'side' not in object_keys:
+            raise ValueError("Front and side images are required")
+        
+        for name, key in object_keys.items():
+            if key != CaptureService.presigned_object_key(capture.id, name):
+                raise ValueError(f"Invalid object key for {name}")
+        
+        # Check the uploads landed (stat calls are blocking, run them together)
+        minio_client = await asyncio.to_thread(get_minio_client)
+        max_size = get_settings().MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        sizes = await asyncio.gather(*[
+            asyncio.to_thread(minio_client.get_file_size, 'raw', key)
+            for key in object_keys.values()
+        ])
+        for name, size in zip(object_keys, sizes):
+            if size is None:
+                raise ValueError(f"Image not uploaded: {name}")
+            if size > max_size:
+                raise ValueError(f"File too large: {name} is more than {max_size} bytes")
+        
+        # Claim the capture atomically so a double-submitted completion
+        # cannot queue a second upload task (which would find the staging
+        # objects already removed and fail a good capture)
+        claimed = (await db.execute(
+            update(Capture).where(
+                Capture.id == capture.id,
+                Capture.user_id == user.id,
+                Capture.status == CaptureStatus.UPLOADING
+            ).values(status=CaptureStatus.QUEUED).returning(Capture.id)
+        )).first()
+        if claimed is None:
+            await db.rollback()
+            raise ValueError("Capture is not awaiting uploads")
+        await db.commit()
+        
+        await get_redis_cache().delete(capture_status_key(capture.id))
+        
+        logger.info(f"Presigned uploads complete for capture {capture.id}")
+        
+        from backend.worker.tasks import process_capture_upload
+        process_capture_upload.delay(str(capture.id), object_keys=object_keys)
+        
+        return capture
+    
+    @staticmethod
+    async def create_capture_from_images(
+        db: AsyncSession,
         user: User,
         metadata: CaptureUploadMetadata,
         front_image: Optional[UploadFile] = None,
@@ -84,9 +539,14 @@ class CaptureService:
         portrait_image: Optional[UploadFile] = None,
         reference_image: Optional[UploadFile] = None
     ) -> Capture:
-        """Create capture from uploaded images"""
+        """
+        Create capture from uploaded images
+        
+        Images are validated and written to the spool directory; EXIF
+        stripping and MinIO uploads happen in the upload worker, so the
+        capture is returned in UPLOADING state when images are stored.
+        """
         
-        # Validate images
         images = {
             'front': front_image,
             'side': side_image,
@@ -94,161 +554,233 @@ class CaptureService:
             'reference': reference_image
         }
         
-        for name, img in images.items():
-            if img:
-                CaptureService.validate_image(img)
-        
-        # Create capture record
-        capture = Capture(
-            id=uuid.uuid4(),
-            user_id=user.id,
-            status=CaptureStatus.QUEUED,
-            source=CaptureSource(metadata.source.value),
-            store_images=metadata.store_images
-        )
-        
-        db.add(capture)
-        db.commit()
-        db.refresh(capture)
-        
-        # Upload images to MinIO if consent given
-        if metadata.store_images:
-            minio_client = get_minio_client()
+        # Validate images concurrently, streaming each one into a spooled file once
+        spooled: Dict[str, BinaryIO] = {}
+        spool_paths: Dict[str, str] = {}
+        try:
+            names = [name for name, img in images.items() if img]
+            validated = await asyncio.gather(
+                *[CaptureService.validate_image(images[name]) for name in names],
+                return_exceptions=True
+            )
+            for name, result in zip(names, validated):
+                if not isinstance(result, BaseException):
+                    spooled[name] = result[0]
+            for result in validated:
+                if isinstance(result, BaseException):
+                    raise result
             
-            for name, img in images.items():
-                if img:
-                    # Read and strip EXIF
-                    contents = img.file.read()
-                    img.file.seek(0)
-                    clean_contents = CaptureService.strip_exif(contents)
-                    
-                    # Upload to MinIO
-                    object_name = f"{capture.id}/{name}.jpg"
-                    bucket_path = minio_client.upload_bytes(
-                        'raw',
-                        object_name,
-                        clean_contents,
-                        content_type='image/jpeg'
-                    )
-                    
-                    # Create artifact record
-                    artifact = Artifact(
-                        id=uuid.uuid4(),
-                        capture_id=capture.id,
-                        bucket_path=bucket_path,
-                        artifact_type=ArtifactType.RAW,
-                        file_size_bytes=len(clean_contents),
-                        content_type='image/jpeg'
-                    )
-                    db.add(artifact)
+            capture = Capture(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                status=CaptureStatus.UPLOADING if metadata.store_images else CaptureStatus.QUEUED,
+                source=CaptureSource(metadata.source.value),
+                store_images=metadata.store_images
+            )
             
-            db.commit()
+            # Hand images to the upload worker if consent given
+            if metadata.store_images:
+                spool_paths = await CaptureService.persist_spools(capture.id, spooled)
+            
+            db.add(capture)
+            await db.commit()
+        finally:
+            for spool in spooled.values():
+                spool.close()
+        
+        await get_redis_cache().delete(dashboard_stats_key(user.id))
         
         logger.info(f"Created capture {capture.id} for user {user.email}")
         
-        # Queue processing job
-        from backend.worker.tasks import process_capture
-        process_capture.delay(str(capture.id))
+        # Queue upload (which queues processing) or processing directly
+        from backend.worker.tasks import process_capture, process_capture_upload
+        if spool_paths:
+            process_capture_upload.delay(str(capture.id), spool_paths=spool_paths)
+        else:
+            process_capture.delay(str(capture.id))
         
         return capture
     
     @staticmethod
-    def create_capture_from_metrics(
-        db: Session,
+    async def create_capture_from_metrics(
+        db: AsyncSession,
         user: User,
         metrics_data: MetricsOnlyUpload
     ) -> Capture:
         """Create capture from client-side processed metrics"""
         
-        # Create capture record
-        capture = Capture(
-            id=uuid.uuid4(),
-            user_id=user.id,
-            status=CaptureStatus.DONE,  # Already processed client-side
-            source=CaptureSource(metrics_data.capture_meta.source.value),
-            store_images=False
-        )
-        
-        db.add(capture)
-        db.flush()
+        # Dump each submodel once; original and current start out identical
+        # and share the dict, which is only serialized on insert
+        body_metrics = metrics_data.metrics.model_dump(mode='json')
+        skin_json = metrics_data.skin.model_dump(mode='json') if metrics_data.skin else None
+        shape_json = metrics_data.shape.model_dump(mode='json') if metrics_data.shape else None
+        quality_json = metrics_data.quality.model_dump(mode='json') if metrics_data.quality else None
+        
+        # Create capture record; RETURNING brings back server defaults
+        # (created_at) so no refresh SELECT is needed
+        capture = (await db.execute(
+            insert(Capture).values(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                status=CaptureStatus.DONE,  # Already processed client-side
+                source=CaptureSource(metrics_data.capture_meta.source.value),
+                store_images=False
+            ).returning(Capture)
+        )).scalar_one()
         
         # Create metrics record
-        metrics = CaptureMetrics(
-            id=uuid.uuid4(),
-            capture_id=capture.id,
-            metrics_json={
-                'original': metrics_data.metrics.dict(),
-                'current': metrics_data.metrics.dict()
-            },
-            skin_json=metrics_data.skin.dict() if metrics_data.skin else None,
-            shape_json=metrics_data.shape.dict() if metrics_data.shape else None,
-            quality_json=metrics_data.quality.dict() if metrics_data.quality else None,
-            model_versions={'client': 'web-v1.0'}  # Client-side version
+        await db.execute(
+            insert(CaptureMetrics).values(
+                id=uuid.uuid4(),
+                capture_id=capture.id,
+                metrics_json={
+                    'original': body_metrics,
+                    'current': body_metrics
+                },
+                skin_json=skin_json,
+                shape_json=shape_json,
+                quality_json=quality_json,
+                model_versions={'client': 'web-v1.0'}  # Client-side version
+            )
         )
+        await db.commit()
         
-        db.add(metrics)
-        db.commit()
-        db.refresh(capture)
+        await get_redis_cache().delete(dashboard_stats_key(user.id))
+        await CaptureService.schedule_user_metrics_refresh()
         
         logger.info(f"Created metrics-only capture {capture.id} for user {user.email}")
         
         return capture
     
     @staticmethod
-    def get_capture_status(db: Session, capture_id: uuid.UUID, user: User) -> Capture:
-        """Get capture status"""
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == user.id
-        ).first()
+    async def get_capture_status(db: AsyncSession, capture_id: uuid.UUID, user: User) -> Dict:
+        """
+        Get capture status
+        
+        Clients poll this while a capture is processing, so the status is
+        cached in Redis for a couple of seconds. The worker drops the key
+        on every status change.
+        """
+        cache = get_redis_cache()
+        key = capture_status_key(capture_id)
+        
+        cached = await cache.get_json(key)
+        if cached is not None:
+            if cached['user_id'] != str(user.id):
+                raise ValueError("Capture not found")
+            return cached
+        
+        # Only the columns the response needs, no ORM instance
+        capture = (await db.execute(
+            select(
+                Capture.id,
+                Capture.user_id,
+                Capture.status,
+                Capture.error_message,
+                Capture.created_at,
+                Capture.processing_started_at,
+                Capture.processing_completed_at
+            ).where(
+                Capture.id == capture_id,
+                Capture.user_id == user.id
+            )
+        )).first()
         
         if not capture:
             raise ValueError("Capture not found")
         
-        return capture
+        capture_status = {
+            'capture_id': str(capture.id),
+            'user_id': str(capture.user_id),
+            'status': capture.status.value,
+            'error_message': capture.error_message,
+            'created_at': capture.created_at,
+            'processing_started_at': capture.processing_started_at,
+            'processing_completed_at': capture.processing_completed_at
+        }
+        await cache.set_json(key, capture_status, CAPTURE_STATUS_TTL_SECONDS)
+        
+        return capture_status
     
     @staticmethod
-    def get_capture_results(db: Session, capture_id: uuid.UUID, user: User) -> Dict:
+    async def get_capture_results(db: AsyncSession, capture_id: uuid.UUID, user: User) -> Dict:
         """Get capture results"""
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == user.id
-        ).first()
-        
-        if not capture:
+        # Capture, metrics and the adjustment check in one round-trip;
+        # EXISTS stops at the first matching adjustment instead of counting.
+        # Columns are projected and Postgres extracts metrics_json->'current'
+        # so the original metrics never leave the database.
+        has_adjustments_expr = exists().where(
+            UserAdjustment.capture_id == Capture.id
+        ).label('has_adjustments')
+        
+        row = (await db.execute(
+            select(
+                Capture.id,
+                Capture.user_id,
+                Capture.status,
+                Capture.created_at,
+                CaptureMetrics.id.label('metrics_id'),
+                CaptureMetrics.metrics_json['current'].label('current_metrics'),
+                CaptureMetrics.skin_json,
+                CaptureMetrics.shape_json,
+                CaptureMetrics.quality_json,
+                CaptureMetrics.model_versions,
+                has_adjustments_expr
+            ).outerjoin(
+                CaptureMetrics, CaptureMetrics.capture_id == Capture.id
+            ).where(
+                Capture.id == capture_id,
+                Capture.user_id == user.id
+            )
+        )).first()
+        
+        if not row:
             raise ValueError("Capture not found")
         
-        if capture.status != CaptureStatus.DONE:
-            raise ValueError(f"Capture not ready. Current status: {capture.status.value}")
-        
-        # Get metrics
-        metrics = db.query(CaptureMetrics).filter(
-            CaptureMetrics.capture_id == capture_id
-        ).first()
+        if row.status != CaptureStatus.DONE:
+            raise ValueError(f"Capture not ready. Current status: {row.status.value}")
         
-        if not metrics:
+        if row.metrics_id is None:
             raise ValueError("Metrics not found")
         
-        # Check for adjustments
-        has_adjustments = db.query(UserAdjustment).filter(
-            UserAdjustment.capture_id == capture_id
-        ).count() > 0
-        
         return {
-            'capture_id': capture.id,
-            'user_id': capture.user_id,
-            'timestamp': capture.created_at,
-            'metrics': metrics.metrics_json.get('current', {}),
-            'skin': metrics.skin_json,
-            'shape': metrics.shape_json,
-            'quality': metrics.quality_json,
-            'model_versions': metrics.model_versions,
-            'has_adjustments': has_adjustments
+            'capture_id': row.id,
+            'user_id': row.user_id,
+            'timestamp': row.created_at,
+            'metrics': row.current_metrics or {},
+            'skin': row.skin_json,
+            'shape': row.shape_json,
+            'quality': row.quality_json,
+            'model_versions': row.model_versions,
+            'has_adjustments': row.has_adjustments
         }
     
     @staticmethod
-    def submit_adjustment(
-        db: Session,
+    async def get_cached_capture_results(db: AsyncSession, capture_id: uuid.UUID, user: User) -> Dict:
+        """
+        Get capture results through the Redis cache
+        
+        Only completed results reach the cache (get_capture_results raises
+        otherwise) and they do not change until the user submits an
+        adjustment, which drops the key.
+        """
+        cache = get_redis_cache()
+        key = capture_results_key(capture_id)
+        
+        cached = await cache.get_json(key)
+        if cached is not None:
+            if cached['user_id'] != str(user.id):
+                raise ValueError("Capture not found")
+            return cached
+        
+        results = await CaptureService.get_capture_results(db, capture_id, user)
+        await cache.set_json(key, results, CAPTURE_RESULTS_TTL_SECONDS)
+        
+        return results
+    
+    @staticmethod
+    async def submit_adjustment(
+        db: AsyncSession,
         capture_id: uuid.UUID,
         user: User,
         adjustment_data: MetricsAdjustment
@@ -256,86 +788,124 @@ class CaptureService:
         """Submit user adjustment to metrics"""
         
         # Get capture and verify ownership
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == user.id
-        ).first()
+        capture = (await db.execute(
+            select(Capture).where(
+                Capture.id == capture_id,
+                Capture.user_id == user.id
+            )
+        )).scalar_one_or_none()
         
         if not capture:
             raise ValueError("Capture not found")
         
         # Get current metrics
-        metrics = db.query(CaptureMetrics).filter(
-            CaptureMetrics.capture_id == capture_id
-        ).first()
+        metrics = (await db.execute(
+            select(CaptureMetrics).where(CaptureMetrics.capture_id == capture_id)
+        )).scalars().first()
         
         if not metrics:
             raise ValueError("Metrics not found")
         
-        # Create adjustment record
-        adjustment = UserAdjustment(
-            id=uuid.uuid4(),
-            capture_id=capture_id,
-            user_id=user.id,
-            original_metrics_json=metrics.metrics_json.get('current', {}),
-            adjusted_metrics_json=adjustment_data.adjusted_metrics.dict(),
-            notes=adjustment_data.notes,
-            source=AdjustmentSource(adjustment_data.source)
+        adjusted_metrics = adjustment_data.adjusted_metrics.model_dump(mode='json')
+        
+        # Create adjustment record (RETURNING replaces the refresh SELECT)
+        adjustment = (await db.execute(
+            insert(UserAdjustment).values(
+                id=uuid.uuid4(),
+                capture_id=capture_id,
+                user_id=user.id,
+                original_metrics_json=metrics.metrics_json.get('current', {}),
+                adjusted_metrics_json=adjusted_metrics,
+                notes=adjustment_data.notes,
+                source=AdjustmentSource(adjustment_data.source)
+            ).returning(UserAdjustment)
+        )).scalar_one()
+        
+        # Point metrics at the latest adjustment, replace the current metrics
+        # and lower confidence after a user edit, all in one UPDATE. jsonb_set
+        # runs in the database, so concurrent adjustments cannot lose each
+        # other's writes (the old in-place dict edits were never flushed at
+        # all, since plain JSONB columns don't track mutation)
+        confidence = CaptureMetrics.quality_json['overall_confidence']
+        await db.execute(
+            update(CaptureMetrics).where(
+                CaptureMetrics.id == metrics.id
+            ).values(
+                latest_adjustment_id=adjustment.id,
+                metrics_json=func.jsonb_set(
+                    CaptureMetrics.metrics_json,
+                    '{current}',
+                    literal(adjusted_metrics, type_=JSONB)
+                ),
+                quality_json=case(
+                    (
+                        func.jsonb_typeof(confidence) == 'number',
+                        func.jsonb_set(
+                            CaptureMetrics.quality_json,
+                            '{overall_confidence}',
+                            func.to_jsonb(confidence.astext.cast(Float) * 0.8)
+                        )
+                    ),
+                    else_=CaptureMetrics.quality_json
+                )
+            ).execution_options(synchronize_session=False)
         )
         
-        db.add(adjustment)
-        
-        # Update metrics to point to latest adjustment
-        metrics.latest_adjustment_id = adjustment.id
-        metrics.metrics_json['current'] = adjustment_data.adjusted_metrics.dict()
-        
-        # Lower confidence after user edit
-        if metrics.quality_json:
-            metrics.quality_json['overall_confidence'] *= 0.8
-        
         # Update capture status
         capture.status = CaptureStatus.EDITED
         
-        db.commit()
-        db.refresh(adjustment)
+        await db.commit()
+        
+        await get_redis_cache().delete(
+            capture_status_key(capture_id),
+            capture_results_key(capture_id),
+            dashboard_stats_key(user.id)
+        )
+        # The capture is now EDITED and leaves the completed-metrics view
+        await CaptureService.schedule_user_metrics_refresh()
         
         logger.info(f"User {user.email} submitted adjustment for capture {capture_id}")
         
         return adjustment
     
     @staticmethod
-    def get_adjustment_history(
-        db: Session,
+    async def get_adjustment_history(
+        db: AsyncSession,
         capture_id: uuid.UUID,
         user: User
     ) -> Dict:
         """Get adjustment history for a capture"""
         
-        # Verify ownership
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == user.id
-        ).first()
-        
-        if not capture:
+        # Verify ownership and fetch metrics in one round-trip
+        row = (await db.execute(
+            select(
+                CaptureMetrics.id.label('metrics_id'),
+                CaptureMetrics.metrics_json['original'].label('original_metrics'),
+                CaptureMetrics.metrics_json['current'].label('current_metrics')
+            ).select_from(Capture).outerjoin(
+                CaptureMetrics, CaptureMetrics.capture_id == Capture.id
+            ).where(
+                Capture.id == capture_id,
+                Capture.user_id == user.id
+            )
+        )).first()
+        
+        if not row:
             raise ValueError("Capture not found")
         
-        # Get metrics
-        metrics = db.query(CaptureMetrics).filter(
-            CaptureMetrics.capture_id == capture_id
-        ).first()
-        
-        if not metrics:
+        if row.metrics_id is None:
             raise ValueError("Metrics not found")
         
-        # Get all adjustments
-        adjustments = db.query(UserAdjustment).filter(
-            UserAdjustment.capture_id == capture_id
-        ).order_by(UserAdjustment.created_at).all()
+        # Get all adjustments (range scan on idx_capture_adjustments)
+        adjustments = (await db.execute(
+            select(UserAdjustment).where(
+                UserAdjustment.capture_id == capture_id
+            ).order_by(UserAdjustment.created_at)
+        )).scalars().all()
         
         return {
             'capture_id': capture_id,
-            'original_metrics': metrics.metrics_json.get('original', {}),
-            'current_metrics': metrics.metrics_json.get('current', {}),
+            'original_metrics': row.original_metrics or {},
+            'current_metrics': row.current_metrics or {},
             'adjustments': adjustments
         }
@@ -4,7 +4,9 @@ Application configuration using Pydantic Settings
 
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
-from typing import List, Union
+from typing import Optional, Tuple, Union
+from functools import lru_cache
+import json
 import os
 
 
@@ -19,14 +21,36 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = Field(..., description="PostgreSQL connection string")
-    DATABASE_POOL_SIZE: int = 20
-    DATABASE_MAX_OVERFLOW: int = 10
+    # Pool limits are per engine (sync and async) in every uvicorn worker,
+    # so a direct Postgres connection can open up to
+    # workers * 2 * (size + overflow). Unset, they default to 50/50 behind
+    # PgBouncer (client connections are cheap there) and 4/2 direct, which
+    # keeps an 8-worker host under Postgres' default max_connections=100.
+    DATABASE_POOL_SIZE: Optional[int] = None
+    DATABASE_MAX_OVERFLOW: Optional[int] = None
+    DATABASE_POOL_WARMUP: bool = True
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 2  # per worker, capped at the pool size
+    DATABASE_PGBOUNCER: bool = False  # DATABASE_URL points at PgBouncer (transaction mode)
+    
+    @property
+    def database_pool_limits(self) -> Tuple[int, int]:
+        """(pool_size, max_overflow) per engine, defaulted by DATABASE_PGBOUNCER"""
+        default_size, default_overflow = (50, 50) if self.DATABASE_PGBOUNCER else (4, 2)
+        return (
+            default_size if self.DATABASE_POOL_SIZE is None else self.DATABASE_POOL_SIZE,
+            default_overflow if self.DATABASE_MAX_OVERFLOW is None else self.DATABASE_MAX_OVERFLOW
+        )
     
     # MinIO Object Storage
     MINIO_ENDPOINT: str = Field(..., description="MinIO endpoint (host:port)")
     MINIO_ACCESS_KEY: str
     MINIO_SECRET_KEY: str
     MINIO_SECURE: bool = False
+    MINIO_REGION: str = "us-east-1"  # Set so clients never ask MinIO for bucket locations
+    # Host clients reach MinIO on; presigned URLs are signed for it (the host
+    # is part of the signature). Defaults to MINIO_ENDPOINT.
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = None
+    MINIO_PUBLIC_SECURE: Optional[bool] = None
     MINIO_BUCKET_RAW: str = "raw-captures"
     MINIO_BUCKET_PROCESSED: str = "processed-artifacts"
     MINIO_BUCKET_MODELS: str = "models"
@@ -43,9 +67,10 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: float = 5.0
     
     # CORS
-    CORS_ORIGINS: Union[str, List[str]] = Field(
+    CORS_ORIGINS: Union[str, Tuple[str, ...]] = Field(
         default='["http://localhost:3000", "http://localhost:8080", "null"]',
         description="Allowed CORS origins (JSON array or comma-separated)"
     )
@@ -54,13 +79,20 @@ class Settings(BaseSettings):
     def parse_cors_origins(cls, v):
         if isinstance(v, str):
             if not v or v.strip() == "":
-                return ["http://localhost:3000", "http://localhost:5173"]
-            return [origin.strip() for origin in v.split(",")]
-        return v
+                return ("http://localhost:3000", "http://localhost:5173")
+            try:
+                parsed = json.loads(v)
+            except ValueError:
+                parsed = v.split(",")
+            if isinstance(parsed, str):
+                parsed = [parsed]
+            return tuple(origin.strip() for origin in parsed)
+        return tuple(v)
     
     # Model Configuration
     MODEL_MANIFEST_URL: str = Field(..., description="URL to models.json manifest")
     DEFAULT_INFERENCE_MODE: str = "client"  # client or server
+    WARM_MODELS: bool = True  # Build the MediaPipe models at startup, not on first request
     ENABLE_SERVER_INFERENCE: bool = False
     
     # Privacy & Retention
@@ -77,11 +109,16 @@ class Settings(BaseSettings):
     WORKER_CONCURRENCY: int = 4
     WORKER_MAX_TASKS_PER_CHILD: int = 100
     WORKER_PREFETCH_MULTIPLIER: int = 4
+    # Per worker process; thread-pool workers need one connection per thread
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 10
     
     # Security
     ENCRYPTION_KEY: str = Field(default="dev-encryption-key-change-in-prod-32bytes", description="32-byte encryption key for AES-256")
     ENABLE_AUDIT_LOGS: bool = True
     MAX_UPLOAD_SIZE_MB: int = 50
+    # Must be shared between the API and upload workers
+    UPLOAD_SPOOL_DIR: str = "/tmp/capture-uploads"
     
     # Feature Flags
     ENABLE_PARTNER_API: bool = True
@@ -93,20 +130,13 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-# Global settings instance
-settings: Settings = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings (singleton pattern)"""
-    global settings
-    if settings is None:
-        settings = Settings()
-    return settings
+    """Get application settings (cached singleton)"""
+    return Settings()
 
 
 def init_settings() -> Settings:
     """Initialize settings (called at startup)"""
-    global settings
-    settings = Settings()
-    return settings
+    get_settings.cache_clear()
+    return get_settings()
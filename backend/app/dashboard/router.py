@@ -3,13 +3,14 @@ Dashboard API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import logging
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_current_user
 from app.dashboard.service import DashboardService
-from db import User, CaptureStatus
+from db import get_async_db, User, CaptureStatus
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +20,9 @@ router = APIRouter(prefix="/user", tags=["dashboard"])
 @router.get("/captures")
 async def get_user_captures(
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -29,12 +30,12 @@ async def get_user_captures(
     
     Args:
         limit: Number of captures to return (1-100)
-        offset: Offset for pagination
+        cursor: Cursor from the previous page's next_cursor
         status: Filter by status (queued, processing, done, failed)
         current_user: Authenticated user
     
     Returns:
-        Paginated list of captures
+        Page of captures with next_cursor for the following page
     """
     try:
         # Parse status if provided
@@ -49,16 +50,20 @@ async def get_user_captures(
                 )
         
         # Get captures
-        result = DashboardService.get_user_captures(
+        result = await DashboardService.get_user_captures(
             db,
             current_user,
             limit=limit,
-            offset=offset,
+            cursor=cursor,
             status=status_filter
         )
         
-        return result
+        # Returned as a response so FastAPI's jsonable_encoder pass is
+        # skipped; orjson serializes the datetimes and UUIDs itself
+        return ORJSONResponse(result)
     
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -66,9 +71,44 @@ async def get_user_captures(
         raise HTTPException(status_code=500, detail="Failed to fetch captures")
 
 
+@router.get("/captures/count")
+async def count_user_captures(
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the number of user's captures
+    
+    Args:
+        status: Filter by status (queued, processing, done, failed)
+        current_user: Authenticated user
+    
+    Returns:
+        Total matching captures
+    """
+    status_filter = None
+    if status:
+        try:
+            status_filter = CaptureStatus(status)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status: {status}. Must be one of: queued, processing, done, failed"
+            )
+    
+    try:
+        total = await DashboardService.count_user_captures(db, current_user, status=status_filter)
+        return ORJSONResponse({'total': total})
+    
+    except Exception as e:
+        logger.error(f"Error counting user captures: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to count captures")
+
+
 @router.get("/stats")
 async def get_user_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -81,8 +121,8 @@ async def get_user_statistics(
         User statistics including total captures, status breakdown, and latest measurements
     """
     try:
-        stats = DashboardService.get_user_statistics(db, current_user)
-        return stats
+        stats = await DashboardService.get_user_statistics(db, current_user)
+        return ORJSONResponse(stats)
     
     except Exception as e:
         logger.error(f"Error fetching user statistics: {str(e)}", exc_info=True)
@@ -93,7 +133,7 @@ async def get_user_statistics(
 async def get_measurement_timeline(
     metric: str = Query("height_cm", description="Metric to track"),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -108,18 +148,18 @@ async def get_measurement_timeline(
         Timeline of measurements
     """
     try:
-        timeline = DashboardService.get_measurement_timeline(
+        timeline = await DashboardService.get_measurement_timeline(
             db,
             current_user,
             metric=metric,
             limit=limit
         )
         
-        return {
+        return ORJSONResponse({
             'metric': metric,
             'data_points': len(timeline),
             'timeline': timeline
-        }
+        })
     
     except Exception as e:
         logger.error(f"Error fetching measurement timeline: {str(e)}", exc_info=True)
@@ -130,7 +170,7 @@ async def get_measurement_timeline(
 async def compare_captures(
     capture_id_1: str,
     capture_id_2: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -145,14 +185,14 @@ async def compare_captures(
         Comparison data with differences
     """
     try:
-        comparison = DashboardService.compare_captures(
+        comparison = await DashboardService.compare_captures(
             db,
             current_user,
             capture_id_1,
             capture_id_2
         )
         
-        return comparison
+        return ORJSONResponse(comparison)
     
     except ValueError as e:
         logger.error(f"Error comparing captures: {str(e)}")
@@ -2,14 +2,21 @@
 Dashboard service for user statistics and capture management
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Dict, Any, Optional
+from sqlalchemy import Float, cast, func, desc, select, true, tuple_
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import base64
+import binascii
 import logging
+import uuid
+import numpy as np
+import orjson
 
-from db import Capture, User, CaptureStatus
-from app.capture.service import CaptureService
+from db import Capture, CaptureMetrics, User, CaptureStatus, USER_METRICS_VIEW_METRICS, user_metrics_view
+from app.storage import get_redis_cache
+from app.storage.redis_client import dashboard_stats_key, DASHBOARD_STATS_TTL_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -18,64 +25,121 @@ class DashboardService:
     """Service for user dashboard operations"""
     
     @staticmethod
-    def get_user_captures(
-        db: Session,
+    def encode_cursor(created_at: datetime, capture_id) -> str:
+        """Opaque pagination cursor for the capture after which a page starts"""
+        raw = f"{created_at.isoformat()}|{capture_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+        try:
+            created_at, capture_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), uuid.UUID(capture_id)
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    async def get_user_captures(
+        db: AsyncSession,
         user: User,
         limit: int = 10,
-        offset: int = 0,
+        cursor: Optional[str] = None,
         status: Optional[CaptureStatus] = None
     ) -> Dict[str, Any]:
         """
-        Get paginated list of user's captures
+        Get a page of user's captures, newest first
+        
+        Keyset pagination on (created_at, id): each page is an index range
+        scan no matter how deep, and no total count is computed (see
+        count_user_captures).
         
         Args:
             db: Database session
             user: Current user
             limit: Number of captures to return
-            offset: Offset for pagination
+            cursor: next_cursor from the previous page (optional)
             status: Filter by status (optional)
         
         Returns:
             Dictionary with captures and pagination info
         """
-        # Build query
-        query = db.query(Capture).filter(Capture.user_id == user.id)
+        stmt = select(
+            Capture.id,
+            Capture.status,
+            Capture.source,
+            Capture.created_at,
+            Capture.updated_at
+        ).where(Capture.user_id == user.id)
         
         # Filter by status if provided
         if status:
-            query = query.filter(Capture.status == status)
-        
-        # Get total count
-        total = query.count()
-        
-        # Get paginated results
-        captures = query.order_by(desc(Capture.created_at)).limit(limit).offset(offset).all()
-        
-        # Format results
-        capture_list = []
-        for capture in captures:
-            capture_list.append({
-                'capture_id': str(capture.id),
-                'status': capture.status.value,
-                'source': capture.source.value if capture.source else None,
-                'created_at': capture.created_at.isoformat(),
-                'updated_at': capture.updated_at.isoformat() if capture.updated_at else None,
-                'has_results': capture.status == CaptureStatus.DONE
-            })
+            stmt = stmt.where(Capture.status == status)
+        
+        if cursor:
+            cursor_created_at, cursor_id = DashboardService.decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Capture.created_at, Capture.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        
+        # One extra row tells whether another page exists
+        rows = (await db.execute(
+            stmt.order_by(desc(Capture.created_at), desc(Capture.id)).limit(limit + 1)
+        )).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        # Format results straight from the projected tuples
+        capture_list = [
+            {
+                'capture_id': capture_id,
+                'status': capture_status.value,
+                'source': source.value if source else None,
+                'created_at': created_at,
+                'updated_at': updated_at,
+                'has_results': capture_status == CaptureStatus.DONE
+            }
+            for capture_id, capture_status, source, created_at, updated_at in rows
+        ]
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = DashboardService.encode_cursor(last.created_at, last.id)
         
         return {
             'captures': capture_list,
-            'total': total,
             'limit': limit,
-            'offset': offset,
-            'has_more': (offset + limit) < total
+            'next_cursor': next_cursor,
+            'has_more': has_more
         }
     
     @staticmethod
-    def get_user_statistics(db: Session, user: User) -> Dict[str, Any]:
+    async def count_user_captures(
+        db: AsyncSession,
+        user: User,
+        status: Optional[CaptureStatus] = None
+    ) -> int:
+        """
+        Count user's captures, optionally by status
+        
+        Answered from the cached statistics, which already hold the total
+        and per-status counts.
+        """
+        stats = await DashboardService.get_user_statistics(db, user)
+        if status:
+            return stats['status_breakdown'].get(status.value, 0)
+        return stats['total_captures']
+    
+    @staticmethod
+    async def get_user_statistics(db: AsyncSession, user: User) -> Dict[str, Any]:
         """
         Get user statistics
         
+        Cached in Redis for a minute; capture creation and status changes
+        drop the entry.
+        
         Args:
             db: Database session
             user: Current user
@@ -83,56 +147,73 @@ class DashboardService:
         Returns:
             Dictionary with user statistics
         """
-        # Total captures
-        total_captures = db.query(Capture).filter(Capture.user_id == user.id).count()
+        cache = get_redis_cache()
+        key = dashboard_stats_key(user.id)
         
-        # Captures by status
-        status_counts = db.query(
-            Capture.status,
-            func.count(Capture.id)
-        ).filter(
-            Capture.user_id == user.id
-        ).group_by(Capture.status).all()
+        cached = await cache.get_json(key)
+        if cached is not None:
+            return cached
         
-        status_breakdown = {status.value: count for status, count in status_counts}
-        
-        # Recent activity (last 30 days)
+        # Totals, per-status counts and 30-day activity in one scan of the
+        # user's captures
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_captures = db.query(Capture).filter(
-            Capture.user_id == user.id,
-            Capture.created_at >= thirty_days_ago
-        ).count()
+        status_columns = [
+            func.count().filter(Capture.status == capture_status).label(capture_status.value)
+            for capture_status in CaptureStatus
+        ]
+        counts = select(
+            func.count().label('total'),
+            func.count().filter(Capture.created_at >= thirty_days_ago).label('recent'),
+            *status_columns
+        ).where(Capture.user_id == user.id).subquery('counts')
         
-        # Get latest measurements (from most recent completed capture)
-        latest_capture = db.query(Capture).filter(
-            Capture.user_id == user.id,
-            Capture.status == CaptureStatus.DONE
-        ).order_by(desc(Capture.created_at)).first()
+        # Latest measurements are denormalized onto the user row by the
+        # trg_captures_user_latest trigger, so this is one round-trip with
+        # no captures/metrics join
+        row = (await db.execute(
+            select(
+                counts,
+                User.latest_capture_id,
+                User.latest_capture_at,
+                User.latest_metrics,
+                User.latest_skin
+            ).select_from(User).join(counts, true()).where(User.id == user.id)
+        )).one()
+        
+        total_captures = row.total
+        recent_captures = row.recent
+        status_breakdown = {
+            capture_status.value: row._mapping[capture_status.value]
+            for capture_status in CaptureStatus
+            if row._mapping[capture_status.value]
+        }
         
         latest_measurements = None
-        if latest_capture:
-            try:
-                results = CaptureService.get_capture_results(db, str(latest_capture.id), user)
+        if row.latest_capture_id is not None:
+            if row.latest_metrics is None:
+                logger.warning(f"Could not fetch latest measurements: metrics not found for capture {row.latest_capture_id}")
+            else:
                 latest_measurements = {
-                    'capture_id': str(latest_capture.id),
-                    'date': latest_capture.created_at.isoformat(),
-                    'metrics': results.get('metrics', {}),
-                    'skin': results.get('skin', {})
+                    'capture_id': row.latest_capture_id,
+                    'date': row.latest_capture_at,
+                    'metrics': row.latest_metrics,
+                    'skin': row.latest_skin
                 }
-            except Exception as e:
-                logger.warning(f"Could not fetch latest measurements: {str(e)}")
         
-        return {
+        stats = {
             'total_captures': total_captures,
             'status_breakdown': status_breakdown,
             'recent_captures_30d': recent_captures,
             'latest_measurements': latest_measurements,
-            'member_since': user.created_at.isoformat()
+            'member_since': user.created_at
         }
+        await cache.set_json(key, stats, DASHBOARD_STATS_TTL_SECONDS)
+        
+        return stats
     
     @staticmethod
-    def get_measurement_timeline(
-        db: Session,
+    async def get_measurement_timeline(
+        db: AsyncSession,
         user: User,
         metric: str = 'height_cm',
         limit: int = 10
@@ -149,37 +230,61 @@ class DashboardService:
         Returns:
             List of measurement data points
         """
-        # Get completed captures
-        captures = db.query(Capture).filter(
-            Capture.user_id == user.id,
-            Capture.status == CaptureStatus.DONE
-        ).order_by(desc(Capture.created_at)).limit(limit).all()
-        
-        timeline = []
-        for capture in captures:
-            try:
-                results = CaptureService.get_capture_results(db, str(capture.id), user)
-                metrics = results.get('metrics', {})
-                
-                if metric in metrics:
-                    timeline.append({
-                        'capture_id': str(capture.id),
-                        'date': capture.created_at.isoformat(),
-                        'value': metrics[metric],
-                        'metric': metric
-                    })
-            except Exception as e:
-                logger.warning(f"Could not fetch results for capture {capture.id}: {str(e)}")
-                continue
+        if metric in USER_METRICS_VIEW_METRICS:
+            # Common metrics are precomputed in mv_user_metrics: an index
+            # scan on (user_id, created_at) with no join or JSONB parsing.
+            # The view is refreshed shortly after captures complete.
+            value = user_metrics_view.c[metric]
+            rows = (await db.execute(
+                select(
+                    user_metrics_view.c.capture_id.label('id'),
+                    user_metrics_view.c.created_at,
+                    value.label('value')
+                ).where(
+                    user_metrics_view.c.user_id == user.id,
+                    value.isnot(None)
+                ).order_by(desc(user_metrics_view.c.created_at)).limit(limit)
+            )).all()
+        else:
+            rows = await DashboardService._query_metric_timeline(db, user, metric, limit)
         
         # Reverse to get chronological order
-        timeline.reverse()
-        
-        return timeline
+        return [
+            {
+                'capture_id': row.id,
+                'date': row.created_at,
+                'value': row.value,
+                'metric': metric
+            }
+            for row in reversed(rows)
+        ]
     
     @staticmethod
-    def compare_captures(
-        db: Session,
+    async def _query_metric_timeline(db: AsyncSession, user: User, metric: str, limit: int) -> list:
+        """Timeline rows for a metric without a view column, read from the JSONB"""
+        # One query: Postgres extracts the metric from the current metrics
+        # JSONB, so no per-capture results lookup is needed. The existence
+        # check is a jsonpath (@?) so ix_capture_metrics_metrics_gin can
+        # serve it; the key is quoted as a jsonpath string literal.
+        current_metrics = CaptureMetrics.metrics_json['current']
+        metric_path = f"$.current.{orjson.dumps(metric).decode()}"
+        return (await db.execute(
+            select(
+                Capture.id,
+                Capture.created_at,
+                current_metrics[metric].astext.cast(Float).label('value')
+            ).join(
+                CaptureMetrics, CaptureMetrics.capture_id == Capture.id
+            ).where(
+                Capture.user_id == user.id,
+                Capture.status == CaptureStatus.DONE,
+                CaptureMetrics.metrics_json.op('@?')(cast(metric_path, JSONPATH))
+            ).order_by(desc(Capture.created_at)).limit(limit)
+        )).all()
+    
+    @staticmethod
+    async def compare_captures(
+        db: AsyncSession,
         user: User,
         capture_id_1: str,
         capture_id_2: str
@@ -196,39 +301,75 @@ class DashboardService:
         Returns:
             Comparison data
         """
-        # Get both captures
-        results_1 = CaptureService.get_capture_results(db, capture_id_1, user)
-        results_2 = CaptureService.get_capture_results(db, capture_id_2, user)
-        
-        # Calculate differences
-        metrics_1 = results_1.get('metrics', {})
-        metrics_2 = results_2.get('metrics', {})
-        
-        differences = {}
-        for key in metrics_1.keys():
-            if key in metrics_2:
-                diff = metrics_2[key] - metrics_1[key]
-                percent_change = (diff / metrics_1[key] * 100) if metrics_1[key] != 0 else 0
-                
-                differences[key] = {
-                    'value_1': metrics_1[key],
-                    'value_2': metrics_2[key],
-                    'difference': diff,
-                    'percent_change': percent_change
-                }
+        try:
+            capture_ids = [uuid.UUID(capture_id_1), uuid.UUID(capture_id_2)]
+        except ValueError:
+            raise ValueError("Capture not found")
+        
+        # Both captures, ownership included, in one round-trip
+        rows = (await db.execute(
+            select(
+                Capture.id,
+                Capture.status,
+                Capture.created_at,
+                CaptureMetrics.id.label('metrics_id'),
+                CaptureMetrics.metrics_json['current'].label('metrics'),
+                CaptureMetrics.skin_json
+            ).outerjoin(
+                CaptureMetrics, CaptureMetrics.capture_id == Capture.id
+            ).where(
+                Capture.id.in_(capture_ids),
+                Capture.user_id == user.id
+            )
+        )).all()
+        by_id = {row.id: row for row in rows}
+        
+        results = []
+        for capture_id in capture_ids:
+            row = by_id.get(capture_id)
+            if row is None:
+                raise ValueError("Capture not found")
+            if row.status != CaptureStatus.DONE:
+                raise ValueError(f"Capture not ready. Current status: {row.status.value}")
+            if row.metrics_id is None:
+                raise ValueError("Metrics not found")
+            results.append(row)
+        result_1, result_2 = results
+        
+        # Calculate differences over the shared metrics in one vector op
+        metrics_1 = result_1.metrics or {}
+        metrics_2 = result_2.metrics or {}
+        
+        keys = [key for key in metrics_1 if key in metrics_2]
+        values_1 = np.fromiter((metrics_1[key] for key in keys), dtype=np.float64, count=len(keys))
+        values_2 = np.fromiter((metrics_2[key] for key in keys), dtype=np.float64, count=len(keys))
+        diffs = values_2 - values_1
+        percent_changes = np.divide(
+            diffs, values_1, out=np.zeros_like(diffs), where=values_1 != 0
+        ) * 100
+        
+        differences = {
+            key: {
+                'value_1': metrics_1[key],
+                'value_2': metrics_2[key],
+                'difference': float(diff),
+                'percent_change': float(percent_change)
+            }
+            for key, diff, percent_change in zip(keys, diffs, percent_changes)
+        }
         
         return {
             'capture_1': {
                 'id': capture_id_1,
-                'date': results_1.get('timestamp'),
+                'date': result_1.created_at,
                 'metrics': metrics_1,
-                'skin': results_1.get('skin', {})
+                'skin': result_1.skin_json
             },
             'capture_2': {
                 'id': capture_id_2,
-                'date': results_2.get('timestamp'),
+                'date': result_2.created_at,
                 'metrics': metrics_2,
-                'skin': results_2.get('skin', {})
+                'skin': result_2.skin_json
             },
             'differences': differences
         }
@@ -4,13 +4,22 @@ Dependency injection utilities for FastAPI
 
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import jwt
+import orjson
+from jwt import PyJWTError
+from datetime import datetime
+from typing import Any, Dict, Optional
 import logging
+import time
+import uuid
 
-from db import get_db, User, UserRole
-from app.config import get_settings
+from db import get_async_db, User, UserRole
+from app.storage import get_redis_cache
+from app.storage.redis_client import (
+    auth_user_key, auth_user_generation_key, AUTH_USER_TTL_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +27,92 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
+def _cached_user_entry(user: User, exp: int, generation: int) -> Dict[str, Any]:
+    """Profile fields of a user for the auth cache (no password hash)"""
+    return {
+        'id': str(user.id),
+        'email': user.email,
+        'role': user.role.value,
+        'consent_flags': user.consent_flags,
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'last_login': user.last_login.isoformat() if user.last_login else None,
+        'is_active': user.is_active,
+        'exp': exp,
+        'generation': generation
+    }
+
+
+def _user_from_cache(entry: Dict[str, Any]) -> User:
+    """Detached User rebuilt from an auth cache entry"""
+    return User(
+        id=uuid.UUID(entry['id']),
+        email=entry['email'],
+        role=UserRole(entry['role']),
+        consent_flags=entry['consent_flags'],
+        created_at=datetime.fromisoformat(entry['created_at']) if entry['created_at'] else None,
+        last_login=datetime.fromisoformat(entry['last_login']) if entry['last_login'] else None,
+        is_active=entry['is_active']
+    )
+
+
+def _unverified_subject(token: str) -> Optional[str]:
+    """
+    User id claimed by a token, read without checking the signature
+    
+    Only used to pick the user's generation key for a cache lookup; the
+    cached entry itself is keyed by the full token, so a forged token
+    still misses.
+    """
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("sub")
+    except PyJWTError:
+        return None
+
+
+async def invalidate_cached_user(user_id):
+    """Drop cached copies of a user under every token after the user changes"""
+    await get_redis_cache().incr(auth_user_generation_key(user_id), AUTH_USER_TTL_SECONDS)
+
+
+async def invalidate_cached_token(token: str):
+    """Drop the cached user for one bearer token (logout)"""
+    await get_redis_cache().delete(auth_user_key(token))
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Dependency to get current authenticated user from JWT token
+    
+    The decoded user is cached in Redis per token for at most
+    AUTH_USER_TTL_SECONDS (and never past the token's expiry), so polling
+    clients skip both the signature check and the user lookup. Entries are
+    stamped with the user's cache generation, which invalidate_cached_user
+    bumps, so a user write invalidates every token's entry at once. The
+    cached user is detached and carries no password hash.
     """
-    settings = get_settings()
+    cache = get_redis_cache()
+    cache_key = auth_user_key(credentials.credentials)
+    generation = 0
+    
+    # Only active users are cached; the entry and the current generation
+    # come back in one round-trip
+    subject = _unverified_subject(credentials.credentials)
+    if subject is not None:
+        raw_entry, raw_generation = await cache.get_many(
+            cache_key, auth_user_generation_key(subject)
+        )
+        generation = int(raw_generation or 0)
+        if raw_entry is not None:
+            cached = orjson.loads(raw_entry)
+            if (
+                cached['id'] == subject
+                and cached.get('generation') == generation
+                and cached['exp'] > time.time()
+            ):
+                return _user_from_cache(cached)
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,22 +120,22 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # Imported here: app.auth's package init imports the router, which
+    # imports this module
+    from app.auth.service import AuthService
+    
     try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = AuthService.decode_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
+    except PyJWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    exp = payload.get("exp", 0)
+    
+    # Token decoding stays sync (CPU-only); the lookup awaits the database
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user is None:
         raise credentials_exception
     
@@ -58,6 +145,10 @@ async def get_current_user(
             detail="User account is inactive"
         )
     
+    ttl = min(AUTH_USER_TTL_SECONDS, int(exp - time.time()))
+    if ttl > 0:
+        await cache.set_json(cache_key, _cached_user_entry(user, exp, generation), ttl)
+    
     return user
 
 
@@ -113,7 +204,7 @@ def require_any_role(*roles: UserRole):
 
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Dependency to get current user if authenticated, otherwise None
@@ -122,21 +213,17 @@ async def get_optional_user(
     if credentials is None:
         return None
     
+    from app.auth.service import AuthService
+    
     try:
-        settings = get_settings()
-        token = credentials.credentials
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = AuthService.decode_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
         
-        user = db.query(User).filter(User.id == user_id).first()
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
         return user if user and user.is_active else None
-    except JWTError:
+    except PyJWTError:
         return None
 
 
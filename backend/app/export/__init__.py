@@ -2,6 +2,6 @@
 Export module for generating PDF reports and other export formats
 """
 
-from app.export.pdf_generator import PDFGenerator
+from app.export.pdf_generator import PDFGenerator, generate_report_async, shutdown_pdf_pool
 
-__all__ = ['PDFGenerator']
+__all__ = ['PDFGenerator', 'generate_report_async', 'shutdown_pdf_pool']
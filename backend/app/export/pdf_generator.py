@@ -6,51 +6,142 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.pdfgen import canvas
-from reportlab.graphics.shapes import Drawing, Rect
+from reportlab.graphics.shapes import Drawing, Group, Rect
 from reportlab.graphics import renderPDF
-import qrcode
+from reportlab.graphics.barcode.qr import QrCodeWidget
 from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, Optional
+import asyncio
 import logging
+import multiprocessing
+import os
 
 logger = logging.getLogger(__name__)
 
 
+# Styles are immutable once built, so every report shares one set instead
+# of rebuilding the sample stylesheet per PDFGenerator
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=30,
+    alignment=1  # Center
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#34495E'),
+    spaceAfter=12,
+    spaceBefore=12
+)
+
+_BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    textColor=colors.HexColor('#2C3E50')
+)
+
+# (label, metrics key) rows of the measurements table, in display order
+_MEASUREMENT_ROWS = (
+    ('Height', 'height_cm'),
+    ('Shoulder Width', 'shoulder_width_cm'),
+    ('Chest Circumference', 'chest_circumference_cm'),
+    ('Waist Circumference', 'waist_circumference_cm'),
+    ('Hip Circumference', 'hip_circumference_cm'),
+    ('Inseam', 'inseam_cm'),
+    ('Torso Length', 'torso_length_cm'),
+    ('Neck Circumference', 'neck_circumference_cm'),
+)
+
+_MEASUREMENTS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+
+_SKIN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+
+_PALETTE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9B59B6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+    ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+_QUALITY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+
+
+@lru_cache(maxsize=1024)
+def _qr_code_group(share_url: str) -> Group:
+    """
+    Vector shapes for a share URL's QR code
+    
+    The widget builds the QR matrix every time it is drawn, so the drawn
+    group is cached instead; shapes are only read while rendering, so
+    reports can share one group.
+    """
+    return QrCodeWidget(share_url, barLevel='L', barBorder=4).draw()
+
+
 class PDFGenerator:
     """Generate professional PDF reports for body measurements"""
     
+    styles = _STYLES
+    title_style = _TITLE_STYLE
+    heading_style = _HEADING_STYLE
+    body_style = _BODY_STYLE
+    
     def __init__(self):
-        self.styles = getSampleStyleSheet()
         self.page_width, self.page_height = A4
-        
-        # Custom styles
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2C3E50'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-        
-        self.heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#34495E'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        self.body_style = ParagraphStyle(
-            'CustomBody',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#2C3E50')
-        )
     
     def generate_report(self, capture_data: Dict[str, Any]) -> bytes:
         """
@@ -138,32 +229,14 @@ class PDFGenerator:
     
     def _create_measurements_table(self, metrics: Dict[str, float]) -> Table:
         """Create formatted measurements table"""
-        data = [
-            ['Measurement', 'Value'],
-            ['Height', f"{metrics.get('height_cm', 0):.1f} cm"],
-            ['Shoulder Width', f"{metrics.get('shoulder_width_cm', 0):.1f} cm"],
-            ['Chest Circumference', f"{metrics.get('chest_circumference_cm', 0):.1f} cm"],
-            ['Waist Circumference', f"{metrics.get('waist_circumference_cm', 0):.1f} cm"],
-            ['Hip Circumference', f"{metrics.get('hip_circumference_cm', 0):.1f} cm"],
-            ['Inseam', f"{metrics.get('inseam_cm', 0):.1f} cm"],
-            ['Torso Length', f"{metrics.get('torso_length_cm', 0):.1f} cm"],
-            ['Neck Circumference', f"{metrics.get('neck_circumference_cm', 0):.1f} cm"],
-        ]
+        data = [['Measurement', 'Value']]
+        data.extend(
+            [label, f"{metrics.get(key, 0):.1f} cm"]
+            for label, key in _MEASUREMENT_ROWS
+        )
         
         table = Table(data, colWidths=[3 * inch, 2 * inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        table.setStyle(_MEASUREMENTS_TABLE_STYLE)
         
         return table
     
@@ -190,18 +263,7 @@ class PDFGenerator:
             data.append(['LAB b*', f"{lab.get('b', 0):.2f}"])
         
         table = Table(data, colWidths=[2.5 * inch, 2.5 * inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        table.setStyle(_SKIN_TABLE_STYLE)
         
         content.append(table)
         
@@ -227,19 +289,7 @@ class PDFGenerator:
             ])
         
         table = Table(data, colWidths=[0.8 * inch, 1.2 * inch, 3 * inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9B59B6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        table.setStyle(_PALETTE_TABLE_STYLE)
         
         content.append(table)
         
@@ -255,45 +305,61 @@ class PDFGenerator:
         ]
         
         table = Table(data, colWidths=[3 * inch, 2 * inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        table.setStyle(_QUALITY_TABLE_STYLE)
         
         return table
     
-    def _create_qr_code(self, capture_id: str) -> Image:
+    def _create_qr_code(self, capture_id: str) -> Drawing:
         """Create QR code for sharing"""
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        
         # URL to share (update with your actual domain)
         share_url = f"https://your-app.com/capture/{capture_id}"
-        qr.add_data(share_url)
-        qr.make(fit=True)
         
-        # Create image
-        qr_image = qr.make_image(fill_color="black", back_color="white")
+        # Drawn as native PDF vector paths; no raster image is encoded
+        # and decoded again on the way into the document
+        qr = _qr_code_group(share_url)
+        x1, y1, x2, y2 = qr.getBounds()
         
-        # Convert to BytesIO
-        buffer = BytesIO()
-        qr_image.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        # Create ReportLab Image
-        img = Image(buffer, width=1.5 * inch, height=1.5 * inch)
+        size = 1.5 * inch
+        drawing = Drawing(
+            size, size,
+            transform=[size / (x2 - x1), 0, 0, size / (y2 - y1), 0, 0]
+        )
+        drawing.add(qr)
         
-        return img
+        return drawing
+
+
+def _render_report(capture_data: Dict[str, Any]) -> bytes:
+    """Process pool entry point (top-level so it pickles)"""
+    return PDFGenerator().generate_report(capture_data)
+
+
+# Rendering is pure CPU and holds the GIL, so reports are built in worker
+# processes. spawn rather than fork: the API process runs threads (event
+# loop executor, DB and Redis pools) that must not be forked mid-operation.
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Get the report rendering process pool (created on first use)"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    """Stop the rendering processes if the pool was started"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+async def generate_report_async(capture_data: Dict[str, Any]) -> bytes:
+    """Render a report in the process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pdf_pool(), _render_report, capture_data)
@@ -3,25 +3,37 @@ Export API endpoints for generating and downloading reports
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+import uuid
 import logging
 
-from app.dependencies import get_db, get_current_user
-from app.export.pdf_generator import PDFGenerator
+from app.dependencies import get_current_user
+from app.export.pdf_generator import generate_report_async
 from app.capture.service import CaptureService
-from db import User
+from app.storage import get_redis_cache
+from app.storage.redis_client import pdf_report_key, PDF_REPORT_TTL_SECONDS
+from db import get_async_db, User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/capture", tags=["export"])
 
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_chunks(data: bytes, chunk_size: int = PDF_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a buffer in fixed-size chunks without copying it"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
 
 @router.get("/{capture_id}/export/pdf")
 async def export_pdf(
-    capture_id: str,
-    db: Session = Depends(get_db),
+    capture_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -33,21 +45,31 @@ async def export_pdf(
     
     Returns:
         PDF file as download
+    
+    Rendered reports are cached by a hash of the results they were built
+    from, so repeated downloads skip ReportLab until the results change.
     """
     try:
         # Get capture results
-        results = CaptureService.get_capture_results(db, capture_id, current_user)
+        results = await CaptureService.get_cached_capture_results(db, capture_id, current_user)
+        
+        cache = get_redis_cache()
+        key = pdf_report_key(results)
         
-        # Generate PDF
-        pdf_generator = PDFGenerator()
-        pdf_bytes = pdf_generator.generate_report(results)
+        pdf_bytes = await cache.get_bytes(key)
+        if pdf_bytes is None:
+            # Rendering is CPU-bound; run it in the report process pool
+            pdf_bytes = await generate_report_async(results)
+            await cache.set_bytes(key, pdf_bytes, PDF_REPORT_TTL_SECONDS)
         
-        # Return as downloadable PDF
-        return Response(
-            content=pdf_bytes,
+        # Return as downloadable PDF, streamed in chunks from an async
+        # generator so no second copy of the file is built for the body
+        return StreamingResponse(
+            _iter_chunks(pdf_bytes),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=report_{capture_id[:8]}.pdf"
+                "Content-Disposition": f"attachment; filename=report_{str(capture_id)[:8]}.pdf",
+                "Content-Length": str(len(pdf_bytes))
             }
         )
     
@@ -62,8 +84,8 @@ async def export_pdf(
 
 @router.get("/{capture_id}/export/json")
 async def export_json(
-    capture_id: str,
-    db: Session = Depends(get_db),
+    capture_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -77,8 +99,8 @@ async def export_json(
         JSON data
     """
     try:
-        # Get capture results
-        results = CaptureService.get_capture_results(db, capture_id, current_user)
+        # Same Redis-cached results the results and PDF endpoints read
+        results = await CaptureService.get_cached_capture_results(db, capture_id, current_user)
         
         return results
     
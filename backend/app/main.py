@@ -4,26 +4,31 @@ FastAPI application factory and main entry point
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from starlette_compress import CompressMiddleware
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
 import logging
+import queue
 import time
-import sys
 import os
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
 from app.config import init_settings, get_settings
 from db import init_db
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging. QueueHandler.prepare() still formats each record on
+# the calling thread (so later changes to its args cannot leak into the
+# line); only the blocking stdout writes move to the listener thread.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +36,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    _log_listener.start()
     logger.info("Starting Fabric Quality Analysis API...")
     
     # Initialize settings
@@ -39,14 +45,55 @@ async def lifespan(app: FastAPI):
     
     # Initialize database
     logger.info("Initializing database connection...")
-    init_db(
+    pool_size, max_overflow = settings.database_pool_limits
+    database = init_db(
         settings.DATABASE_URL,
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=settings.DATABASE_MAX_OVERFLOW
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pgbouncer=settings.DATABASE_PGBOUNCER
     )
     logger.info("Database initialized successfully")
     
-    # TODO: Initialize MinIO buckets
+    # A few connections per worker take the connect latency off the first
+    # requests; filling whole pools in every worker would exhaust Postgres
+    if settings.DATABASE_POOL_WARMUP:
+        opened = await database.warm_up(
+            min(settings.DATABASE_POOL_WARMUP_CONNECTIONS, pool_size)
+        )
+        logger.info(f"Database pool warmed with {opened} connections")
+    
+    # Size the default executor used by asyncio.to_thread (password hashing etc.)
+    executor = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
+    asyncio.get_running_loop().set_default_executor(executor)
+    
+    # Batch last_login writes instead of committing on every login
+    from app.auth.service import AuthService
+    login_flush_task = asyncio.create_task(
+        AuthService.run_login_flush_loop(
+            database.AsyncSessionLocal,
+            settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS
+        )
+    )
+    
+    # Create the MinIO client (and its connection pool) before the first upload
+    from app.storage import init_minio
+    try:
+        await asyncio.to_thread(init_minio)
+        logger.info("MinIO client initialized")
+    except Exception as e:
+        logger.warning(f"MinIO not reachable at startup, will retry on first use: {str(e)}")
+    from app.storage import get_async_minio_client
+    await get_async_minio_client()
+    
+    # Build the shared MediaPipe models once, off the event loop
+    if settings.WARM_MODELS:
+        from models import warm_models
+        try:
+            await asyncio.to_thread(warm_models)
+            logger.info("Visualization models loaded")
+        except Exception as e:
+            logger.warning(f"Could not preload models, will build on first use: {str(e)}")
+    
     # TODO: Initialize Celery connection
     # TODO: Load model manifest
     
@@ -56,9 +103,22 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
+    login_flush_task.cancel()
+    try:
+        await login_flush_task
+    except asyncio.CancelledError:
+        pass
+    executor.shutdown(wait=False)
+    from app.export import shutdown_pdf_pool
+    shutdown_pdf_pool()
+    from app.storage import close_async_minio_client, close_redis_cache
+    await close_async_minio_client()
+    await close_redis_cache()
     # TODO: Close database connections
     # TODO: Close MinIO connections
     logger.info("Shutdown complete")
+    # Drains anything still queued
+    _log_listener.stop()
 
 
 def create_app() -> FastAPI:
@@ -72,6 +132,7 @@ def create_app() -> FastAPI:
         description="Privacy-first image analysis system for body measurements and skin tone analysis",
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -84,24 +145,39 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # GZip Middleware
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Compression Middleware - zstd, then Brotli, then gzip by Accept-Encoding.
+    # Only compressible media types are touched, so PDFs and images pass
+    # through as they are.
+    app.add_middleware(
+        CompressMiddleware,
+        minimum_size=500,
+        zstd_level=4,
+        brotli_quality=4,
+        gzip_level=5
+    )
+    
+    # Request logging middleware (skipped for liveness probes, which are
+    # polled every few seconds and would drown out real traffic)
+    unlogged_paths = frozenset(("/health", "/"))
     
-    # Request logging middleware
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        start_time = time.time()
+        path = request.url.path
+        if path in unlogged_paths:
+            return await call_next(request)
+        
+        start_time = time.perf_counter()
         
-        # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
+        # Log request (%-style so nothing is formatted when INFO is off)
+        logger.info("Request: %s %s", request.method, path)
         
         response = await call_next(request)
         
         # Log response
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} Duration: {process_time:.3f}s"
+            "Response: %s %s Status: %s Duration: %.3fs",
+            request.method, path, response.status_code, process_time
         )
         
         # Add custom header
@@ -179,14 +255,21 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    # python -m app.main, from the backend directory
     import uvicorn
     
     settings = get_settings()
     
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
+        # Reload runs a single process
+        workers=None if settings.DEBUG else os.cpu_count(),
+        # Fail loudly if uvicorn[standard] is missing instead of silently
+        # falling back to asyncio + h11
+        loop="uvloop",
+        http="httptools",
         log_level=settings.LOG_LEVEL.lower()
     )
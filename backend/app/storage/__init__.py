@@ -3,9 +3,17 @@ Storage package initialization
 """
 
 from app.storage.minio_client import MinIOClient, get_minio_client, init_minio
+from app.storage.async_minio_client import AsyncMinIOClient, get_async_minio_client, close_async_minio_client
+from app.storage.redis_client import RedisCache, get_redis_cache, close_redis_cache
 
 __all__ = [
     "MinIOClient",
     "get_minio_client",
-    "init_minio"
+    "init_minio",
+    "AsyncMinIOClient",
+    "get_async_minio_client",
+    "close_async_minio_client",
+    "RedisCache",
+    "get_redis_cache",
+    "close_redis_cache"
 ]
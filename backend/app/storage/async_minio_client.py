@@ -0,0 +1,161 @@
+"""
+Async S3 client for reading and writing MinIO objects from request handlers
+"""
+
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
+from contextlib import AsyncExitStack
+from typing import Optional
+import aioboto3
+import logging
+
+from app.config import get_settings
+from app.storage.minio_client import MINIO_POOL_MAXSIZE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMinIOClient:
+    """
+    aioboto3 S3 client bound to the MinIO buckets
+
+    The sync MinIOClient stays for Celery workers and upload paths; this
+    one lets API handlers await object transfers on the event loop instead
+    of parking a thread on each download.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        scheme = "https" if settings.MINIO_SECURE else "http"
+
+        self.endpoint_url = f"{scheme}://{settings.MINIO_ENDPOINT}"
+        self.access_key = settings.MINIO_ACCESS_KEY
+        self.secret_key = settings.MINIO_SECRET_KEY
+        self.region = settings.MINIO_REGION
+        self.buckets = {
+            "raw": settings.MINIO_BUCKET_RAW,
+            "processed": settings.MINIO_BUCKET_PROCESSED,
+            "models": settings.MINIO_BUCKET_MODELS,
+            "exports": settings.MINIO_BUCKET_EXPORTS
+        }
+        self.client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def start(self):
+        """Open the client and its connection pool"""
+        self._exit_stack = AsyncExitStack()
+        self.client = await self._exit_stack.enter_async_context(
+            aioboto3.Session().client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                region_name=self.region,
+                aws_access_key_id=self.access_key,
+                aws_secret_access_key=self.secret_key,
+                config=AioConfig(
+                    signature_version="s3v4",
+                    max_pool_connections=MINIO_POOL_MAXSIZE,
+                    connect_timeout=5,
+                    read_timeout=60,
+                    retries={"max_attempts": 3}
+                )
+            )
+        )
+
+    async def close(self):
+        """Close the client and its connection pool"""
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self.client = None
+
+    def _bucket(self, bucket_type: str) -> str:
+        bucket_name = self.buckets.get(bucket_type)
+        if not bucket_name:
+            raise ValueError(f"Invalid bucket type: {bucket_type}")
+        return bucket_name
+
+    async def download_file(self, bucket_type: str, object_name: str) -> bytes:
+        """
+        Download a file from MinIO
+
+        Args:
+            bucket_type: Type of bucket
+            object_name: Name/path of the object
+
+        Returns:
+            File contents as bytes
+        """
+        bucket_name = self._bucket(bucket_type)
+
+        try:
+            response = await self.client.get_object(Bucket=bucket_name, Key=object_name)
+            async with response["Body"] as body:
+                data = await body.read()
+
+            logger.debug("Downloaded %s from %s", object_name, bucket_name)
+            return data
+
+        except ClientError as e:
+            logger.error(f"Error downloading {object_name}: {str(e)}")
+            raise
+
+    async def download_file_if_exists(self, bucket_type: str, object_name: str) -> Optional[bytes]:
+        """Download a file, or None if it does not exist (one round-trip)"""
+        bucket_name = self._bucket(bucket_type)
+
+        try:
+            response = await self.client.get_object(Bucket=bucket_name, Key=object_name)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def upload_bytes(
+        self,
+        bucket_type: str,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream"
+    ) -> str:
+        """Upload bytes data to MinIO; returns the bucket path"""
+        bucket_name = self._bucket(bucket_type)
+
+        try:
+            await self.client.put_object(
+                Bucket=bucket_name,
+                Key=object_name,
+                Body=data,
+                ContentType=content_type
+            )
+
+            logger.debug("Uploaded %s to %s", object_name, bucket_name)
+            return f"{bucket_name}/{object_name}"
+
+        except ClientError as e:
+            logger.error(f"Error uploading {object_name}: {str(e)}")
+            raise
+
+
+# Global async MinIO client instance
+async_minio_client: Optional[AsyncMinIOClient] = None
+
+
+async def get_async_minio_client() -> AsyncMinIOClient:
+    """Get the async MinIO client, opening it on first use (singleton)"""
+    global async_minio_client
+    if async_minio_client is None:
+        client = AsyncMinIOClient()
+        await client.start()
+        async_minio_client = client
+    return async_minio_client
+
+
+async def close_async_minio_client():
+    """Close the async MinIO client if it was created"""
+    global async_minio_client
+    if async_minio_client is not None:
+        await async_minio_client.close()
+        async_minio_client = None
@@ -3,9 +3,14 @@ MinIO client wrapper for object storage
 """
 
 from minio import Minio
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 from typing import Optional, BinaryIO
 from datetime import timedelta
+from functools import lru_cache
+from urllib3.util.retry import Retry
+import certifi
+import urllib3
 import logging
 import io
 
@@ -13,6 +18,11 @@ from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Upload workers put several images concurrently per capture, and the API
+# serves visualizations and exports in parallel, so keep more keep-alive
+# connections per host than the client's default of 10
+MINIO_POOL_MAXSIZE = 50
+
 
 class MinIOClient:
     """Wrapper for MinIO operations"""
@@ -20,11 +30,39 @@ class MinIOClient:
     def __init__(self):
         settings = get_settings()
         
+        http_client = urllib3.PoolManager(
+            num_pools=16,
+            maxsize=MINIO_POOL_MAXSIZE,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=certifi.where(),
+            # MinIO is on the local network; fail fast on connect, but
+            # allow multi-MB image transfers to finish reading
+            timeout=urllib3.Timeout(connect=2.0, read=60.0),
+            retries=Retry(
+                total=3,
+                backoff_factor=0.1,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
+        
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
+            secure=settings.MINIO_SECURE,
+            region=settings.MINIO_REGION,
+            http_client=http_client
+        )
+        
+        # Presigned URLs are signed offline (the region is fixed, so no
+        # GetBucketLocation call) for the host clients actually reach
+        public_secure = settings.MINIO_PUBLIC_SECURE
+        self.signer = Minio(
+            settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=settings.MINIO_SECURE if public_secure is None else public_secure,
+            region=settings.MINIO_REGION
         )
         
         self.buckets = {
@@ -87,7 +125,7 @@ class MinIOClient:
                 metadata=metadata or {}
             )
             
-            logger.info(f"Uploaded {object_name} to {bucket_name}")
+            logger.debug("Uploaded %s to %s", object_name, bucket_name)
             return f"{bucket_name}/{object_name}"
         
         except S3Error as e:
@@ -134,7 +172,7 @@ class MinIOClient:
             response.close()
             response.release_conn()
             
-            logger.info(f"Downloaded {object_name} from {bucket_name}")
+            logger.debug("Downloaded %s from %s", object_name, bucket_name)
             return data
         
         except S3Error as e:
@@ -163,19 +201,62 @@ class MinIOClient:
             raise ValueError(f"Invalid bucket type: {bucket_type}")
         
         try:
-            url = self.client.presigned_get_object(
+            url = self.signer.presigned_get_object(
                 bucket_name,
                 object_name,
                 expires=expires
             )
             
-            logger.info(f"Generated presigned URL for {object_name}")
+            logger.debug("Generated presigned URL for %s", object_name)
             return url
         
         except S3Error as e:
             logger.error(f"Error generating presigned URL: {str(e)}")
             raise
     
+    def get_presigned_put_url(
+        self,
+        bucket_type: str,
+        object_name: str,
+        expires: timedelta = timedelta(minutes=10)
+    ) -> str:
+        """
+        Generate a presigned URL the client can PUT an object to directly
+        
+        Args:
+            bucket_type: Type of bucket
+            object_name: Name/path of the object
+            expires: Expiration time for the URL
+        
+        Returns:
+            Presigned URL string
+        """
+        bucket_name = self.buckets.get(bucket_type)
+        if not bucket_name:
+            raise ValueError(f"Invalid bucket type: {bucket_type}")
+        
+        try:
+            return self.signer.presigned_put_object(
+                bucket_name,
+                object_name,
+                expires=expires
+            )
+        
+        except S3Error as e:
+            logger.error(f"Error generating presigned PUT URL: {str(e)}")
+            raise
+    
+    def get_file_size(self, bucket_type: str, object_name: str) -> Optional[int]:
+        """Size of an object in bytes, or None if it does not exist"""
+        bucket_name = self.buckets.get(bucket_type)
+        if not bucket_name:
+            raise ValueError(f"Invalid bucket type: {bucket_type}")
+        
+        try:
+            return self.client.stat_object(bucket_name, object_name).size
+        except S3Error:
+            return None
+    
     def delete_file(self, bucket_type: str, object_name: str):
         """Delete a file from MinIO"""
         bucket_name = self.buckets.get(bucket_type)
@@ -184,7 +265,7 @@ class MinIOClient:
         
         try:
             self.client.remove_object(bucket_name, object_name)
-            logger.info(f"Deleted {object_name} from {bucket_name}")
+            logger.debug("Deleted %s from %s", object_name, bucket_name)
         
         except S3Error as e:
             logger.error(f"Error deleting {object_name}: {str(e)}")
@@ -197,10 +278,11 @@ class MinIOClient:
             raise ValueError(f"Invalid bucket type: {bucket_type}")
         
         try:
-            for del_err in self.client.remove_objects(bucket_name, object_names):
+            delete_list = [DeleteObject(name) for name in object_names]
+            for del_err in self.client.remove_objects(bucket_name, delete_list):
                 logger.error(f"Error deleting object: {del_err}")
             
-            logger.info(f"Deleted {len(object_names)} objects from {bucket_name}")
+            logger.debug("Deleted %d objects from %s", len(object_names), bucket_name)
         
         except S3Error as e:
             logger.error(f"Error in batch delete: {str(e)}")
@@ -219,20 +301,13 @@ class MinIOClient:
             return False
 
 
-# Global MinIO client instance
-minio_client: Optional[MinIOClient] = None
-
-
+@lru_cache(maxsize=1)
 def get_minio_client() -> MinIOClient:
-    """Get MinIO client instance (singleton)"""
-    global minio_client
-    if minio_client is None:
-        minio_client = MinIOClient()
-    return minio_client
+    """Get MinIO client instance (cached singleton)"""
+    return MinIOClient()
 
 
 def init_minio() -> MinIOClient:
     """Initialize MinIO client"""
-    global minio_client
-    minio_client = MinIOClient()
-    return minio_client
+    get_minio_client.cache_clear()
+    return get_minio_client()
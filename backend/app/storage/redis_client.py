@@ -0,0 +1,222 @@
+"""
+Redis client for short-lived response caching
+"""
+
+import redis
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from typing import Any, List, Optional, Tuple
+import hashlib
+import orjson
+import logging
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Status rows churn while a capture is queued/processing, so polls are only
+# cached briefly; finished results are immutable until the user edits them
+CAPTURE_STATUS_TTL_SECONDS = 2
+CAPTURE_RESULTS_TTL_SECONDS = 300
+DASHBOARD_STATS_TTL_SECONDS = 60
+IDEMPOTENCY_TTL_SECONDS = 3600
+# In-progress placeholder; short so a request that dies without cleaning
+# up only blocks retries briefly
+IDEMPOTENCY_PENDING_TTL_SECONDS = 60
+# Upper bound; entries never outlive the token they were cached for
+AUTH_USER_TTL_SECONDS = 300
+# Reports are keyed by content, so edits produce a new key instead of
+# needing invalidation
+PDF_REPORT_TTL_SECONDS = 86400
+# Visualizations derive only from the capture's stored front image
+VISUALIZATION_TTL_SECONDS = 86400
+
+# Set while a mv_user_metrics refresh is scheduled, so a burst of completed
+# captures shares one refresh
+USER_METRICS_REFRESH_KEY = "mv:user_metrics:refresh_pending"
+USER_METRICS_REFRESH_TTL_SECONDS = 60
+USER_METRICS_REFRESH_DELAY_SECONDS = 5
+
+# SET NX the placeholder, or return what is already stored, in one step so
+# two concurrent retries cannot both claim the key
+_CLAIM_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return false
+end
+return redis.call('GET', KEYS[1])
+"""
+_PENDING = b"null"
+
+
+def capture_status_key(capture_id) -> str:
+    return f"cap:status:{capture_id}"
+
+
+def capture_results_key(capture_id) -> str:
+    return f"cap:results:{capture_id}"
+
+
+def dashboard_stats_key(user_id) -> str:
+    return f"dash:stats:{user_id}"
+
+
+def idempotency_cache_key(user_id, key: str) -> str:
+    return f"idem:{user_id}:{key}"
+
+
+def auth_user_key(token: str) -> str:
+    # blake2b only derives a fixed-size key; the token itself is never stored
+    return "auth:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def auth_user_generation_key(user_id) -> str:
+    # Bumped on every user write; cached entries from an older generation
+    # are ignored, whichever token they were cached under
+    return f"auth:gen:{user_id}"
+
+
+def visualization_key(kind: str, capture_id) -> str:
+    return f"viz:{kind}:{capture_id}"
+
+
+def pdf_report_key(content: Any) -> str:
+    digest = hashlib.blake2b(
+        orjson.dumps(content, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+    return f"pdf:{digest}"
+
+
+class RedisCache:
+    """
+    Async Redis wrapper storing JSON values
+
+    Cache errors are logged and treated as misses so Redis being down
+    never fails a request.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        settings = get_settings()
+        self.client = aioredis.from_url(url or settings.REDIS_URL)
+        self._claim = self.client.register_script(_CLAIM_SCRIPT)
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        """Get a cached JSON value, or None on miss"""
+        try:
+            raw = await self.client.get(key)
+        except RedisError as e:
+            logger.warning(f"Redis GET {key} failed: {str(e)}")
+            return None
+
+        return orjson.loads(raw) if raw is not None else None
+
+    async def get_many(self, *keys: str) -> List[Optional[bytes]]:
+        """Get several raw values in one round-trip (None for each miss)"""
+        try:
+            return await self.client.mget(keys)
+        except RedisError as e:
+            logger.warning(f"Redis MGET failed: {str(e)}")
+            return [None] * len(keys)
+
+    async def set_json(self, key: str, value: Any, ttl: int):
+        """Cache a JSON-serializable value for ttl seconds"""
+        try:
+            await self.client.set(key, orjson.dumps(value), ex=ttl)
+        except RedisError as e:
+            logger.warning(f"Redis SET {key} failed: {str(e)}")
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a cached raw value, or None on miss"""
+        try:
+            return await self.client.get(key)
+        except RedisError as e:
+            logger.warning(f"Redis GET {key} failed: {str(e)}")
+            return None
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int):
+        """Cache a raw value for ttl seconds"""
+        try:
+            await self.client.set(key, value, ex=ttl)
+        except RedisError as e:
+            logger.warning(f"Redis SET {key} failed: {str(e)}")
+
+    async def set_if_absent(self, key: str, ttl: int) -> bool:
+        """Set a flag key unless it exists; True if this call set it (or Redis is down)"""
+        try:
+            return bool(await self.client.set(key, b"1", nx=True, ex=ttl))
+        except RedisError as e:
+            logger.warning(f"Redis SET NX {key} failed: {str(e)}")
+            return True
+
+    async def claim_idempotency_key(self, key: str, ttl: int) -> Tuple[bool, Optional[Any]]:
+        """
+        Claim an idempotency key, or fetch what an earlier request stored
+
+        Returns:
+            (claimed, stored value). The stored value is None while the
+            request that claimed the key is still running. If Redis is
+            unavailable the key counts as claimed.
+        """
+        try:
+            raw = await self._claim(keys=[key], args=[_PENDING, ttl])
+        except RedisError as e:
+            logger.warning(f"Redis idempotency claim {key} failed: {str(e)}")
+            return True, None
+
+        if raw is None:
+            return True, None
+        return False, orjson.loads(raw)
+
+    async def incr(self, key: str, ttl: int):
+        """Increment a counter key and (re)set its ttl"""
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.incr(key).expire(key, ttl).execute()
+        except RedisError as e:
+            logger.warning(f"Redis INCR {key} failed: {str(e)}")
+
+    async def delete(self, *keys: str):
+        """Delete cached keys"""
+        try:
+            await self.client.delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Redis DEL failed: {str(e)}")
+
+    async def close(self):
+        """Close the connection pool"""
+        await self.client.aclose()
+
+
+def invalidate_capture_cache(client: redis.Redis, capture_id, user_id=None) -> None:
+    """
+    Drop cached status and results for a capture (sync, for workers)
+
+    Passing the owner's user_id also drops their dashboard statistics.
+    """
+    keys = [capture_status_key(capture_id), capture_results_key(capture_id)]
+    if user_id is not None:
+        keys.append(dashboard_stats_key(user_id))
+
+    try:
+        client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Error invalidating cache for capture {capture_id}: {str(e)}")
+
+
+# Global Redis cache instance
+redis_cache: Optional[RedisCache] = None
+
+
+def get_redis_cache() -> RedisCache:
+    """Get Redis cache instance (singleton)"""
+    global redis_cache
+    if redis_cache is None:
+        redis_cache = RedisCache()
+    return redis_cache
+
+
+async def close_redis_cache():
+    """Close the Redis cache if it was created"""
+    global redis_cache
+    if redis_cache is not None:
+        await redis_cache.close()
+        redis_cache = None
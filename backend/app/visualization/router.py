@@ -2,24 +2,37 @@
 Visualization API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
 import logging
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_current_user
 from app.visualization.service import VisualizationService
-from db import User, Capture
+from db import get_async_db, User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/capture", tags=["visualization"])
 
+CACHE_CONTROL = "public, max-age=3600"  # Cache for 1 hour
+
+
+def _matches_etag(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
 
 @router.get("/{capture_id}/visualize/pose")
 async def get_pose_visualization(
-    capture_id: str,
-    db: Session = Depends(get_db),
+    capture_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -33,28 +46,33 @@ async def get_pose_visualization(
         JPEG image with pose keypoints overlaid
     """
     try:
-        # Verify ownership
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == current_user.id
-        ).first()
-        
-        if not capture:
-            raise HTTPException(status_code=404, detail="Capture not found")
+        # Verifies ownership; a client holding the current image gets an
+        # empty 304 without anything being fetched or rendered
+        etag = await VisualizationService.get_visualization_etag(
+            db, capture_id, current_user, 'pose'
+        )
+        if etag and _matches_etag(request, etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+            )
         
-        # Generate visualization
-        image_bytes = VisualizationService.generate_pose_visualization(db, capture_id)
+        # Generated off the event loop and cached after the first request
+        image_bytes = await VisualizationService.get_visualization(
+            db, capture_id, current_user, 'pose'
+        )
         
         if not image_bytes:
             raise HTTPException(status_code=500, detail="Failed to generate visualization")
         
         # Return image
+        headers = {"Cache-Control": CACHE_CONTROL}
+        if etag:
+            headers["ETag"] = etag
         return Response(
             content=image_bytes,
             media_type="image/jpeg",
-            headers={
-                "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
-            }
+            headers=headers
         )
     
     except ValueError as e:
@@ -68,8 +86,9 @@ async def get_pose_visualization(
 
 @router.get("/{capture_id}/visualize/segmentation")
 async def get_segmentation_visualization(
-    capture_id: str,
-    db: Session = Depends(get_db),
+    capture_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -83,28 +102,33 @@ async def get_segmentation_visualization(
         JPEG image with segmentation mask overlaid
     """
     try:
-        # Verify ownership
-        capture = db.query(Capture).filter(
-            Capture.id == capture_id,
-            Capture.user_id == current_user.id
-        ).first()
-        
-        if not capture:
-            raise HTTPException(status_code=404, detail="Capture not found")
+        # Verifies ownership; a client holding the current image gets an
+        # empty 304 without anything being fetched or rendered
+        etag = await VisualizationService.get_visualization_etag(
+            db, capture_id, current_user, 'segmentation'
+        )
+        if etag and _matches_etag(request, etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+            )
         
-        # Generate visualization
-        image_bytes = VisualizationService.generate_segmentation_visualization(db, capture_id)
+        # Generated off the event loop and cached after the first request
+        image_bytes = await VisualizationService.get_visualization(
+            db, capture_id, current_user, 'segmentation'
+        )
         
         if not image_bytes:
             raise HTTPException(status_code=500, detail="Failed to generate visualization")
         
         # Return image
+        headers = {"Cache-Control": CACHE_CONTROL}
+        if etag:
+            headers["ETag"] = etag
         return Response(
             content=image_bytes,
             media_type="image/jpeg",
-            headers={
-                "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
-            }
+            headers=headers
         )
     
     except ValueError as e:
@@ -2,99 +2,293 @@
 Visualization service for generating pose and segmentation images
 """
 
-from sqlalchemy.orm import Session
-from io import BytesIO
-from typing import Optional
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from botocore.exceptions import ClientError
+from cachetools import TTLCache
+from typing import Optional, Tuple
+import asyncio
+import hashlib
 import logging
+import threading
+import uuid
 
-from db import Capture, Artifact, ArtifactType
-from app.storage import get_minio_client
+from db import Capture, Artifact, ArtifactType, User
+from app.storage import get_async_minio_client, get_redis_cache
+from app.storage.redis_client import visualization_key, VISUALIZATION_TTL_SECONDS
+# Shared per-process models and their inference locks
+from models.model_loader import (
+    get_pose_estimator as _get_pose_estimator,
+    get_segmenter as _get_segmenter,
+    pose_lock as _pose_lock,
+    segmenter_lock as _segmenter_lock,
+)
 
 logger = logging.getLogger(__name__)
 
+# (capture_id, user_id) -> front view bucket path, for captures the user is
+# known to own. Owners and stored artifacts never change, so a hit skips the
+# database entirely. Only touched from the event loop, so no lock.
+_OWNERSHIP_CACHE_TTL_SECONDS = 300
+_owned_front_paths: TTLCache = TTLCache(maxsize=10_000, ttl=_OWNERSHIP_CACHE_TTL_SECONDS)
+
+# libjpeg-turbo handle, or False once it is known to be unavailable
+_turbojpeg = None
+_turbojpeg_lock = threading.Lock()
+_JPEG_MAGIC = b'\xff\xd8'
+
+
+def _get_turbojpeg():
+    """Shared TurboJPEG codec, or None if libjpeg-turbo is not installed"""
+    global _turbojpeg
+    if _turbojpeg is None:
+        with _turbojpeg_lock:
+            if _turbojpeg is None:
+                try:
+                    from turbojpeg import TurboJPEG
+                    _turbojpeg = TurboJPEG()
+                except (ImportError, OSError, RuntimeError) as e:
+                    logger.warning(f"libjpeg-turbo unavailable, using OpenCV for JPEG: {str(e)}")
+                    _turbojpeg = False
+    return _turbojpeg or None
+
+
+def _decode_image(image_bytes: bytes):
+    """Decode an uploaded image to a BGR array (JPEG via libjpeg-turbo)"""
+    import cv2
+    import numpy as np
+    
+    tj = _get_turbojpeg()
+    if tj is not None and image_bytes[:2] == _JPEG_MAGIC:
+        from turbojpeg import TJPF_BGR
+        return tj.decode(image_bytes, pixel_format=TJPF_BGR)
+    
+    # PNG uploads, or no libjpeg-turbo
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _encode_jpeg(image, quality: int = 90) -> bytes:
+    """Encode a BGR array as JPEG bytes"""
+    tj = _get_turbojpeg()
+    if tj is not None:
+        from turbojpeg import TJPF_BGR
+        return tj.encode(image, quality=quality, pixel_format=TJPF_BGR)
+    
+    import cv2
+    _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
+# MediaPipe resizes to a few hundred pixels internally anyway, so inputs
+# are capped at this longest side before inference
+INFERENCE_MAX_SIDE = 640
+
+
+def _downscale_for_inference(image):
+    """Image shrunk so its longest side is at most INFERENCE_MAX_SIDE"""
+    import cv2
+    
+    scale = INFERENCE_MAX_SIDE / max(image.shape[:2])
+    if scale >= 1:
+        return image
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
 
 class VisualizationService:
     """Service for generating visualization images"""
     
     @staticmethod
-    def generate_pose_visualization(db: Session, capture_id: str) -> Optional[bytes]:
+    def visualization_object_name(capture_id: str, kind: str) -> str:
+        """Object name of a stored visualization in the processed bucket"""
+        return f"visualizations/{capture_id}/{kind}.jpg"
+    
+    @staticmethod
+    def _parse_bucket_path(bucket_path: str) -> Tuple[str, str]:
+        """Split a stored bucket/object path into (bucket type, object name)"""
+        bucket_name, object_name = bucket_path.split('/', 1)
+        
+        # Map bucket name to type
+        bucket_type_map = {
+            'raw-captures': 'raw',
+            'processed-captures': 'processed',
+            'models': 'models'
+        }
+        return bucket_type_map.get(bucket_name, 'raw'), object_name
+    
+    @staticmethod
+    async def _get_owned_front_path(
+        db: AsyncSession,
+        capture_id: uuid.UUID,
+        user: User
+    ) -> Optional[str]:
         """
-        Generate pose keypoint visualization
+        Front view bucket path of a capture the user owns
+        
+        Raises ValueError if the user does not own the capture; returns None
+        if the front image has not been stored yet.
+        """
+        owner_key = (capture_id, user.id)
+        bucket_path = _owned_front_paths.get(owner_key)
+        if bucket_path is not None:
+            return bucket_path
+        
+        # Ownership and the front view artifact in one round-trip
+        row = (await db.execute(
+            select(Capture.id, Artifact.bucket_path).outerjoin(
+                Artifact,
+                and_(
+                    Artifact.capture_id == Capture.id,
+                    Artifact.artifact_type == ArtifactType.FRONT_VIEW
+                )
+            ).where(
+                Capture.id == capture_id,
+                Capture.user_id == user.id
+            ).limit(1)
+        )).first()
+        
+        if not row:
+            raise ValueError("Capture not found")
+        
+        # The front image may still be on its way to MinIO; only a
+        # complete answer is remembered
+        if row.bucket_path is not None:
+            _owned_front_paths[owner_key] = row.bucket_path
+        return row.bucket_path
+    
+    @staticmethod
+    async def get_visualization_etag(
+        db: AsyncSession,
+        capture_id: uuid.UUID,
+        user: User,
+        kind: str
+    ) -> Optional[str]:
+        """
+        Strong ETag for a visualization, or None if it cannot exist yet
+        
+        A visualization is a pure function of its kind and the stored
+        front image, so the tag is derived from those and is known before
+        anything is rendered or fetched.
+        """
+        bucket_path = await VisualizationService._get_owned_front_path(db, capture_id, user)
+        if bucket_path is None:
+            return None
+        digest = hashlib.blake2b(f"{kind}:{bucket_path}".encode(), digest_size=8).hexdigest()
+        return f'"{digest}"'
+    
+    @staticmethod
+    async def get_visualization(
+        db: AsyncSession,
+        capture_id: uuid.UUID,
+        user: User,
+        kind: str
+    ) -> Optional[bytes]:
+        """
+        Get a visualization, generating it only on first request
+        
+        Cache-aside: Redis first, then the copy stored in the processed
+        bucket (which survives Redis restarts), and only then the model
+        pipeline. A capture's front image never changes, so neither does
+        its visualization.
+        
+        The database and MinIO are only touched here, on the async session
+        and the async S3 client; the rendering thread receives the
+        downloaded front image. Ownership checks are remembered in-process
+        for a few minutes, so repeat requests skip the database.
         
         Args:
             db: Database session
             capture_id: Capture UUID
+            user: Current user (must own the capture)
+            kind: 'pose' or 'segmentation'
         
         Returns:
             JPEG image bytes or None
         """
-        # Lazy imports to avoid loading heavy dependencies
-        import cv2
-        import numpy as np
-        from models.pose_estimator import PoseEstimator
+        bucket_path = await VisualizationService._get_owned_front_path(db, capture_id, user)
+        
+        generators = {
+            'pose': VisualizationService.generate_pose_visualization,
+            'segmentation': VisualizationService.generate_segmentation_visualization
+        }
+        
+        cache = get_redis_cache()
+        key = visualization_key(kind, capture_id)
         
+        image_bytes = await cache.get_bytes(key)
+        if image_bytes is not None:
+            return image_bytes
+        
+        minio_client = await get_async_minio_client()
+        object_name = VisualizationService.visualization_object_name(capture_id, kind)
         try:
-            # Get capture
-            capture = db.query(Capture).filter(Capture.id == capture_id).first()
-            if not capture:
-                raise ValueError(f"Capture {capture_id} not found")
-            
-            # Get front view artifact
-            artifact = db.query(Artifact).filter(
-                Artifact.capture_id == capture_id,
-                Artifact.artifact_type == ArtifactType.FRONT_VIEW
-            ).first()
-            
-            if not artifact:
+            image_bytes = await minio_client.download_file_if_exists('processed', object_name)
+        except ClientError as e:
+            logger.warning(f"Could not read stored {kind} visualization for {capture_id}: {str(e)}")
+            image_bytes = None
+        
+        if image_bytes is None:
+            if bucket_path is None:
                 raise ValueError("Front view image not found")
             
-            # Download image from MinIO
-            minio_client = get_minio_client()
-            
-            # Parse bucket path
-            bucket_name, object_name = artifact.bucket_path.split('/', 1)
-            
-            # Map bucket name to type
-            bucket_type_map = {
-                'raw-captures': 'raw',
-                'processed-captures': 'processed',
-                'models': 'models'
-            }
-            bucket_type = bucket_type_map.get(bucket_name, 'raw')
-            
-            # Download image
-            image_bytes = minio_client.download_file(bucket_type, object_name)
-            
-            # Convert to numpy array
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # The download is awaited on the event loop; only decoding,
+            # model inference and JPEG encoding (CPU-bound) go to a thread
+            bucket_type, front_object = VisualizationService._parse_bucket_path(bucket_path)
+            front_bytes = await minio_client.download_file(bucket_type, front_object)
+            image_bytes = await asyncio.to_thread(generators[kind], front_bytes, capture_id)
+            if not image_bytes:
+                return None
+            
+            try:
+                await minio_client.upload_bytes('processed', object_name, image_bytes, 'image/jpeg')
+            except ClientError as e:
+                logger.warning(f"Could not store {kind} visualization for {capture_id}: {str(e)}")
+        
+        await cache.set_bytes(key, image_bytes, VISUALIZATION_TTL_SECONDS)
+        
+        return image_bytes
+    
+    @staticmethod
+    def generate_pose_visualization(image_bytes: bytes, capture_id: str) -> Optional[bytes]:
+        """
+        Generate pose keypoint visualization
+        
+        Args:
+            image_bytes: Encoded front view image
+            capture_id: Capture UUID (for logging)
+        
+        Returns:
+            JPEG image bytes or None
+        """
+        # Lazy imports to avoid loading heavy dependencies
+        import cv2
+        
+        try:
+            image = _decode_image(image_bytes)
             
             if image is None:
                 raise ValueError("Failed to decode image")
             
-            # Initialize pose estimator
-            pose_estimator = PoseEstimator(
-                min_detection_confidence=0.5,
-                model_complexity=1
-            )
+            pose_estimator = _get_pose_estimator()
             
-            # Detect pose
-            result = pose_estimator.detect(image)
+            # Detect pose on a downscaled copy; landmarks are normalized to
+            # [0, 1], so they apply to the full-size image unchanged
+            small = _downscale_for_inference(image)
+            with _pose_lock:
+                result = pose_estimator.detect(small)
             
             if result is None:
                 logger.warning(f"No pose detected for capture {capture_id}")
                 # Return original image
-                _, buffer = cv2.imencode('.jpg', image)
-                return buffer.tobytes()
+                return _encode_jpeg(image, quality=95)
             
             # Visualize
-            annotated = pose_estimator.visualize(image, result['landmarks'])
+            annotated = pose_estimator.visualize(image, result['landmarks_array'])
             
             # Add text overlay
             h, w = annotated.shape[:2]
             cv2.putText(
                 annotated,
-                f"Keypoints: {len(result['landmarks'])} | Confidence: {result['confidence']:.1%}",
+                f"Keypoints: {len(result['landmarks_array'])} | Confidence: {result['confidence']:.1%}",
                 (10, 30),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.7,
@@ -103,79 +297,50 @@ class VisualizationService:
             )
             
             # Encode to JPEG
-            _, buffer = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            jpeg_bytes = _encode_jpeg(annotated, quality=90)
             
             logger.info(f"Generated pose visualization for capture {capture_id}")
             
-            return buffer.tobytes()
+            return jpeg_bytes
         
         except Exception as e:
             logger.error(f"Error generating pose visualization: {str(e)}", exc_info=True)
             raise
     
     @staticmethod
-    def generate_segmentation_visualization(db: Session, capture_id: str) -> Optional[bytes]:
+    def generate_segmentation_visualization(image_bytes: bytes, capture_id: str) -> Optional[bytes]:
         """
         Generate segmentation mask visualization
         
         Args:
-            db: Database session
-            capture_id: Capture UUID
+            image_bytes: Encoded front view image
+            capture_id: Capture UUID (for logging)
         
         Returns:
             JPEG image bytes or None
         """
         # Lazy imports to avoid loading heavy dependencies
         import cv2
-        import numpy as np
-        from models.segmentation import SkinSegmenter
         
         try:
-            # Get capture
-            capture = db.query(Capture).filter(Capture.id == capture_id).first()
-            if not capture:
-                raise ValueError(f"Capture {capture_id} not found")
-            
-            # Get front view artifact
-            artifact = db.query(Artifact).filter(
-                Artifact.capture_id == capture_id,
-                Artifact.artifact_type == ArtifactType.FRONT_VIEW
-            ).first()
-            
-            if not artifact:
-                raise ValueError("Front view image not found")
-            
-            # Download image from MinIO
-            minio_client = get_minio_client()
-            
-            # Parse bucket path
-            bucket_name, object_name = artifact.bucket_path.split('/', 1)
-            
-            # Map bucket name to type
-            bucket_type_map = {
-                'raw-captures': 'raw',
-                'processed-captures': 'processed',
-                'models': 'models'
-            }
-            bucket_type = bucket_type_map.get(bucket_name, 'raw')
-            
-            # Download image
-            image_bytes = minio_client.download_file(bucket_type, object_name)
-            
-            # Convert to numpy array
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = _decode_image(image_bytes)
             
             if image is None:
                 raise ValueError("Failed to decode image")
             
-            # Initialize segmenter
-            segmenter = SkinSegmenter(model_selection=1)
+            segmenter = _get_segmenter()
             
-            # Generate mask
-            mask = segmenter.segment(image, threshold=0.5)
+            # Generate mask on a downscaled copy, then bring it back to the
+            # full image size
+            small = _downscale_for_inference(image)
+            with _segmenter_lock:
+                mask = segmenter.segment(small, threshold=0.5)
+            if small is not image:
+                h, w = image.shape[:2]
+                mask = cv2.resize(mask, (w, h), interpolation=cv2.INTER_NEAREST)
             
-            person_pixels = int(np.sum(mask > 0))
+            # The segmenter's mask is already uint8 (0/255)
+            person_pixels = cv2.countNonZero(mask)
             total_pixels = mask.shape[0] * mask.shape[1]
             percentage = (person_pixels / total_pixels) * 100
             
@@ -194,11 +359,11 @@ class VisualizationService:
             )
             
             # Encode to JPEG
-            _, buffer = cv2.imencode('.jpg', overlay, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            jpeg_bytes = _encode_jpeg(overlay, quality=90)
             
             logger.info(f"Generated segmentation visualization for capture {capture_id}")
             
-            return buffer.tobytes()
+            return jpeg_bytes
         
         except Exception as e:
             logger.error(f"Error generating segmentation visualization: {str(e)}", exc_info=True)
@@ -15,9 +15,12 @@ from .models import (
     CaptureStatus,
     CaptureSource,
     ArtifactType,
-    AdjustmentSource
+    AdjustmentSource,
+    USER_METRICS_VIEW_METRICS,
+    user_metrics_view,
+    uuid7
 )
-from .database import Database, init_db, get_db
+from .database import Database, init_db, get_db, get_async_db, approx_count, approx_count_async
 
 __all__ = [
     "Base",
@@ -33,7 +36,13 @@ __all__ = [
     "CaptureSource",
     "ArtifactType",
     "AdjustmentSource",
+    "USER_METRICS_VIEW_METRICS",
+    "user_metrics_view",
+    "uuid7",
     "Database",
     "init_db",
-    "get_db"
+    "get_db",
+    "get_async_db",
+    "approx_count",
+    "approx_count_async"
 ]
@@ -2,32 +2,180 @@
 Database connection and session management
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select, table, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator, Optional
+import asyncio
+import logging
+import orjson
+import uuid
 import os
 
 from .models import Base
 
+logger = logging.getLogger(__name__)
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a sync PostgreSQL URL to use the asyncpg driver"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def _json_serializer(value: Any) -> str:
+    """orjson-backed serializer for JSON/JSONB columns"""
+    # Worker results may carry numpy scalars; json.dumps allowed int keys
+    return orjson.dumps(
+        value,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+# Planner row estimate, kept current by autovacuum/ANALYZE; -1 until the
+# table has been analyzed at least once
+_RELTUPLES_SQL = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+)
+
+
+def _exact_count_stmt(table_name: str):
+    return select(func.count()).select_from(table(table_name))
+
+
+def approx_count(session: Session, table_name: str) -> int:
+    """
+    Approximate row count of a whole table from pg_class.reltuples
+    
+    A catalog lookup instead of a full scan; for counters that only need a
+    magnitude. Falls back to COUNT(*) for tables never analyzed.
+    """
+    estimate = session.execute(_RELTUPLES_SQL, {"table_name": table_name}).scalar()
+    if estimate is None or estimate < 0:
+        return session.execute(_exact_count_stmt(table_name)).scalar_one()
+    return estimate
+
+
+async def approx_count_async(session: AsyncSession, table_name: str) -> int:
+    """approx_count for an async session"""
+    estimate = (await session.execute(_RELTUPLES_SQL, {"table_name": table_name})).scalar()
+    if estimate is None or estimate < 0:
+        return (await session.execute(_exact_count_stmt(table_name))).scalar_one()
+    return estimate
+
 
 class Database:
-    def __init__(self, database_url: str, pool_size: int = 20, max_overflow: int = 10):
+    def __init__(
+        self,
+        database_url: str,
+        pool_size: int = 50,
+        max_overflow: int = 50,
+        pgbouncer: bool = False
+    ):
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pgbouncer = pgbouncer
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        
         self.engine = create_engine(
             database_url,
             poolclass=QueuePool,
             pool_size=pool_size,
             max_overflow=max_overflow,
             pool_pre_ping=True,  # Verify connections before using
+            # Multi-row INSERT ... VALUES pages for executemany inserts, and
+            # psycopg2 execute_batch for executemany UPDATE/DELETE
+            executemany_mode="values_plus_batch",
+            insertmanyvalues_page_size=1000,
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
             echo=os.getenv("DEBUG", "false").lower() == "true"
         )
+        # expire_on_commit=False: committed instances keep their loaded
+        # state, so reading them afterwards does not trigger a reload SELECT
         self.SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
+            expire_on_commit=False,
             bind=self.engine
         )
 
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """asyncpg engine, created on first use so workers never open it"""
+        if self._async_engine is None:
+            connect_args = {}
+            if self.pgbouncer:
+                # PgBouncer in transaction mode hands each transaction to
+                # any server connection, so asyncpg's named prepared
+                # statements must be unique and never reused
+                connect_args = {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"
+                }
+            self._async_engine = create_async_engine(
+                to_async_url(self.database_url),
+                connect_args=connect_args,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_pre_ping=True,
+                json_serializer=_json_serializer,
+                json_deserializer=orjson.loads,
+                echo=os.getenv("DEBUG", "false").lower() == "true"
+            )
+        return self._async_engine
+
+    @property
+    def AsyncSessionLocal(self) -> async_sessionmaker:
+        """Session factory bound to the async engine"""
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                self.async_engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        return self._async_session_factory
+
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Open async pool connections up front
+        
+        Connecting and authenticating on first use shows up as latency
+        spikes on the first burst of requests, so the pool is filled at
+        startup instead.
+        
+        Args:
+            connections: How many to open (defaults to pool_size)
+        
+        Returns:
+            Number of connections opened
+        """
+        count = self.pool_size if connections is None else connections
+        
+        async def _open():
+            conn = await self.async_engine.connect()
+            await conn.exec_driver_sql("SELECT 1")
+            return conn
+        
+        results = await asyncio.gather(*(_open() for _ in range(count)), return_exceptions=True)
+        opened = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Database warm-up connection failed: {str(result)}")
+                continue
+            # Closing returns the connection to the pool, still open
+            await result.close()
+            opened += 1
+        return opened
+
     def create_tables(self):
         """Create all tables in the database"""
         Base.metadata.create_all(bind=self.engine)
@@ -57,15 +205,25 @@ class Database:
         finally:
             session.close()
 
+    async def get_async_db(self) -> AsyncGenerator[AsyncSession, None]:
+        """Dependency for FastAPI to get an async database session"""
+        async with self.AsyncSessionLocal() as session:
+            yield session
+
 
 # Global database instance (initialized in main.py)
 db: Database = None
 
 
-def init_db(database_url: str, pool_size: int = 20, max_overflow: int = 10):
+def init_db(
+    database_url: str,
+    pool_size: int = 50,
+    max_overflow: int = 50,
+    pgbouncer: bool = False
+):
     """Initialize the global database instance"""
     global db
-    db = Database(database_url, pool_size, max_overflow)
+    db = Database(database_url, pool_size, max_overflow, pgbouncer)
     return db
 
 
@@ -74,3 +232,11 @@ def get_db() -> Generator[Session, None, None]:
     if db is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
     yield from db.get_db()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency to get an async database session"""
+    if db is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+    async for session in db.get_async_db():
+        yield session
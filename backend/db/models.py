@@ -4,18 +4,33 @@ Database schema for Fabric Quality Analysis System
 
 from sqlalchemy import (
     Column, String, Integer, Boolean, DateTime, Text, JSON, 
-    ForeignKey, Enum, Index, Float
+    ForeignKey, Enum, Index, Float, MetaData, Table, Computed, insert
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import uuid
 import enum
+import os
+import time
 
 Base = declarative_base()
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (RFC 9562 version 7)
+    
+    48-bit millisecond timestamp followed by random bits; consecutive ids land
+    on the right edge of the primary key btree instead of random pages.
+    """
+    value = (time.time_ns() // 1_000_000 & 0xFFFFFFFFFFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class UserRole(str, enum.Enum):
     USER = "user"
     ADMIN = "admin"
@@ -24,6 +39,7 @@ class UserRole(str, enum.Enum):
 
 
 class CaptureStatus(str, enum.Enum):
+    UPLOADING = "uploading"
     QUEUED = "queued"
     PROCESSING = "processing"
     DONE = "done"
@@ -52,19 +68,41 @@ class AdjustmentSource(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    # Unique through ix_users_email_covering below
+    email = Column(String(255), nullable=False)
     password_hash = Column(String(255), nullable=False)
     role = Column(Enum(UserRole, create_type=False), default=UserRole.USER, nullable=False)
-    consent_flags = Column(JSONB, default={}, nullable=False)
+    # Not indexed: no query filters on consent keys. Add an expression index
+    # (e.g. ((consent_flags->>'marketing'))) when one does.
+    consent_flags = Column(JSONB, default=dict, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
 
+    # Latest completed capture, denormalized for the dashboard statistics.
+    # Maintained by the trg_captures_user_latest trigger (migration 009),
+    # never written by the application. Deferred so authentication lookups
+    # do not load the JSONB.
+    latest_capture_id = deferred(Column(UUID(as_uuid=True), nullable=True))
+    latest_capture_at = deferred(Column(DateTime(timezone=True), nullable=True))
+    latest_metrics = deferred(Column(JSONB, nullable=True))
+    latest_skin = deferred(Column(JSONB, nullable=True))
+
     # Relationships
     captures = relationship("Capture", back_populates="user", cascade="all, delete-orphan")
     adjustments = relationship("UserAdjustment", back_populates="user", foreign_keys="[UserAdjustment.user_id]")
 
+    __table_args__ = (
+        # Covers the login lookup (email -> id, password_hash, is_active)
+        Index(
+            "ix_users_email_covering",
+            "email",
+            unique=True,
+            postgresql_include=["password_hash", "is_active", "id"]
+        ),
+    )
+
 
 class Capture(Base):
     __tablename__ = "captures"
@@ -74,7 +112,9 @@ class Capture(Base):
     status = Column(Enum(CaptureStatus, create_type=False), default=CaptureStatus.QUEUED, nullable=False, index=True)
     source = Column(Enum(CaptureSource, create_type=False), default=CaptureSource.WEB, nullable=False)
     store_images = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Not indexed on its own (dropped in migration 012); the per-user
+    # indexes below lead with user_id and order by created_at
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     processing_started_at = Column(DateTime(timezone=True), nullable=True)
     processing_completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -88,11 +128,37 @@ class Capture(Base):
     adjustments = relationship("UserAdjustment", back_populates="capture", cascade="all, delete-orphan")
 
     __table_args__ = (
-        Index("idx_user_status", "user_id", "status"),
-        Index("idx_created_at", "created_at"),
+        # Status-filtered dashboard listings, newest first
+        Index("ix_captures_user_status_created", "user_id", "status", created_at.desc()),
+        # Latest completed capture / completed-capture timeline
+        Index(
+            "ix_captures_user_done_created",
+            "user_id",
+            created_at.desc(),
+            postgresql_where=(status == CaptureStatus.DONE)
+        ),
+        # Newest-first keyset pagination per user (dashboard listing)
+        Index(
+            "idx_captures_user_created_id",
+            "user_id",
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["status", "source", "updated_at"]
+        ),
     )
 
 
+# Generation expressions of CaptureMetrics' promoted scalar columns
+# (also used by migration 011)
+CAPTURE_METRICS_COLUMNS = {
+    'height_cm': "(metrics_json->'current'->>'height_cm')::float",
+    'shoulder_width_cm': "(metrics_json->'current'->>'shoulder_width_cm')::float",
+    'monk_bucket': "(skin_json->>'monk_bucket')::integer",
+    'overall_confidence': "(quality_json->>'overall_confidence')::float",
+    'pose_model_version': "(model_versions->>'pose')::varchar(32)",
+}
+
+
 class CaptureMetrics(Base):
     __tablename__ = "capture_metrics"
 
@@ -106,7 +172,17 @@ class CaptureMetrics(Base):
     quality_json = Column(JSONB, nullable=True)  # Lighting, card detection, overall confidence
     
     # Model version tracking
-    model_versions = Column(JSONB, default={}, nullable=False)  # {pose: "v1.2", regressor: "v2.0"}
+    model_versions = Column(JSONB, default=dict, nullable=False)  # {pose: "v1.2", regressor: "v2.0"}
+    
+    # Hot scalars promoted out of the JSONB for filtering, sorting and
+    # aggregation. Generated by Postgres from the blobs above, so every
+    # write path (including the adjustment jsonb_set UPDATE) keeps them in
+    # step; never assign them directly.
+    height_cm = Column(Float, Computed(CAPTURE_METRICS_COLUMNS['height_cm']), index=True)
+    shoulder_width_cm = Column(Float, Computed(CAPTURE_METRICS_COLUMNS['shoulder_width_cm']))
+    monk_bucket = Column(Integer, Computed(CAPTURE_METRICS_COLUMNS['monk_bucket']), index=True)
+    overall_confidence = Column(Float, Computed(CAPTURE_METRICS_COLUMNS['overall_confidence']), index=True)
+    pose_model_version = Column(String(32), Computed(CAPTURE_METRICS_COLUMNS['pose_model_version']))
     
     # Reference to latest adjustment
     latest_adjustment_id = Column(UUID(as_uuid=True), ForeignKey("user_adjustments.id"), nullable=True)
@@ -118,6 +194,18 @@ class CaptureMetrics(Base):
     capture = relationship("Capture", back_populates="metrics")
     latest_adjustment = relationship("UserAdjustment", foreign_keys=[latest_adjustment_id], post_update=True)
 
+    __table_args__ = (
+        # Serves jsonpath existence (@?) and containment (@>) filters on the
+        # metrics, e.g. the timeline for metrics without a view column.
+        # The other JSONB columns are read, never filtered, so stay unindexed.
+        Index(
+            "ix_capture_metrics_metrics_gin",
+            "metrics_json",
+            postgresql_using="gin",
+            postgresql_ops={"metrics_json": "jsonb_path_ops"}
+        ),
+    )
+
 
 class Artifact(Base):
     __tablename__ = "artifacts"
@@ -163,7 +251,8 @@ class UserAdjustment(Base):
     __tablename__ = "user_adjustments"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    capture_id = Column(UUID(as_uuid=True), ForeignKey("captures.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Lookups by capture are served by idx_capture_adjustments (capture_id, created_at)
+    capture_id = Column(UUID(as_uuid=True), ForeignKey("captures.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Snapshot of original metrics before adjustment
@@ -198,17 +287,64 @@ class AuditLog(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Nullable for system actions
-    action = Column(String(100), nullable=False, index=True)  # e.g., "capture.upload", "user.delete"
+    action = Column(String(100), nullable=False)  # e.g., "capture.upload", "user.delete"
     resource_type = Column(String(50), nullable=False)  # e.g., "capture", "user", "label"
     resource_id = Column(UUID(as_uuid=True), nullable=True)
-    event_metadata = Column(JSONB, default={}, nullable=False)  # Additional context
+    # Additional context; not indexed until something filters on it
+    # (GIN jsonb_path_ops would then serve @> containment lookups)
+    event_metadata = Column(JSONB, default=dict, nullable=False)
     ip_address = Column(String(45), nullable=True)  # IPv4 or IPv6
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     actor = relationship("User", foreign_keys=[actor_id])
 
     __table_args__ = (
         Index("idx_actor_action", "actor_id", "action"),
-        Index("idx_resource", "resource_type", "resource_id"),
+        # Recent events for a resource, in index order; its prefix also
+        # serves plain (resource_type, resource_id) lookups
+        Index("idx_audit_resource_time", "resource_type", "resource_id", timestamp.desc()),
+        Index("ix_audit_logs_timestamp_desc", timestamp.desc()),
     )
+
+    @classmethod
+    def bulk_log(cls, session, records: list) -> None:
+        """
+        Insert many audit events in one statement per page of rows
+        
+        An executemany of the ORM insert goes through SQLAlchemy's
+        insertmanyvalues batching, so N events cost one multi-row INSERT
+        per 1000 rows instead of N round-trips. Python-side defaults (id,
+        event_metadata) are still applied per row. Does not commit.
+        
+        Args:
+            session: Sync database session
+            records: Dicts of AuditLog column values
+        """
+        if records:
+            session.execute(insert(cls), records)
+
+
+# Metrics with a column of their own in mv_user_metrics
+USER_METRICS_VIEW_METRICS = (
+    "height_cm",
+    "shoulder_width_cm",
+    "chest_circumference_cm",
+    "waist_circumference_cm",
+    "hip_circumference_cm",
+    "inseam_cm",
+    "torso_length_cm",
+    "neck_circumference_cm",
+)
+
+# Materialized view of completed captures' current metrics, one column per
+# metric (created in migration 007). Kept on its own MetaData so create_all
+# and autogenerate never treat it as a table.
+user_metrics_view = Table(
+    "mv_user_metrics",
+    MetaData(),
+    Column("capture_id", UUID(as_uuid=True), primary_key=True),
+    Column("user_id", UUID(as_uuid=True)),
+    Column("created_at", DateTime(timezone=True)),
+    *(Column(metric, Float) for metric in USER_METRICS_VIEW_METRICS)
+)
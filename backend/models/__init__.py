@@ -2,8 +2,11 @@
 Models package initialization
 """
 
-from models.model_loader import ModelManager
+from models.model_loader import ModelManager, get_pose_estimator, get_segmenter, warm_models
 
 __all__ = [
-    "ModelManager"
+    "ModelManager",
+    "get_pose_estimator",
+    "get_segmenter",
+    "warm_models"
 ]
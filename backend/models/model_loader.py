@@ -3,13 +3,112 @@ Model management and inference
 """
 
 import os
-import json
-from typing import Dict, Optional, Any
+import orjson
+from functools import lru_cache
+from typing import Dict, Optional, Any, Tuple
 import logging
+import threading
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# MediaPipe graphs take seconds and hundreds of MB to build, so each model
+# is built once per process and shared by every ModelManager and the API's
+# visualizations. A graph is not safe to run from several threads at once,
+# so inference on each one is serialized by its own lock.
+_model_init_lock = threading.Lock()
+pose_lock = threading.Lock()
+segmenter_lock = threading.Lock()
+
+
+# Placeholder circumference heuristic: circumference ≈ π * (width + depth),
+# assuming depth ≈ 0.7 * width; the neck is a rough fraction of the shoulders
+CIRCUMFERENCE_FACTOR = float(np.pi * 1.7)
+NECK_FACTOR = 0.9
+
+# Realistic-looking keypoints (33, 3) returned when no pose is detected.
+# Built once and read-only; callers get a copy
+_PLACEHOLDER_KEYPOINTS = np.array([
+    # Nose
+    [0.5, 0.15, 0.95],
+    # Eyes
+    [0.48, 0.14, 0.9], [0.48, 0.14, 0.9], [0.47, 0.14, 0.9],
+    [0.52, 0.14, 0.9], [0.52, 0.14, 0.9], [0.53, 0.14, 0.9],
+    # Ears
+    [0.45, 0.15, 0.85], [0.55, 0.15, 0.85],
+    # Mouth
+    [0.49, 0.17, 0.9], [0.51, 0.17, 0.9],
+    # Shoulders
+    [0.4, 0.25, 0.95], [0.6, 0.25, 0.95],
+    # Elbows
+    [0.35, 0.4, 0.9], [0.65, 0.4, 0.9],
+    # Wrists
+    [0.3, 0.55, 0.85], [0.7, 0.55, 0.85],
+    # Hands
+    [0.28, 0.57, 0.8], [0.72, 0.57, 0.8],
+    [0.29, 0.56, 0.8], [0.71, 0.56, 0.8],
+    [0.3, 0.56, 0.8], [0.7, 0.56, 0.8],
+    # Hips
+    [0.42, 0.6, 0.95], [0.58, 0.6, 0.95],
+    # Knees
+    [0.41, 0.8, 0.9], [0.59, 0.8, 0.9],
+    # Ankles
+    [0.4, 0.95, 0.85], [0.6, 0.95, 0.85],
+    # Feet
+    [0.39, 0.97, 0.8], [0.61, 0.97, 0.8],
+    [0.4, 0.96, 0.8], [0.6, 0.96, 0.8],
+], dtype=np.float32)
+_PLACEHOLDER_KEYPOINTS.flags.writeable = False
+
+
+# Parsed manifests by path, with the mtime they were read at; shared by
+# every ModelManager (treat the returned dict as read-only)
+_manifest_cache: Dict[str, Tuple[int, Dict]] = {}
+
+
+def _load_manifest_cached(path: str) -> Dict:
+    """Parse a models.json manifest, re-reading it only when it changes"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _manifest_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        manifest = orjson.loads(f.read())
+    _manifest_cache[path] = (mtime, manifest)
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def _build_pose_estimator():
+    from models.pose_estimator import PoseEstimator
+    return PoseEstimator(min_detection_confidence=0.5, model_complexity=1)
+
+
+@lru_cache(maxsize=1)
+def _build_segmenter():
+    from models.segmentation import SkinSegmenter
+    return SkinSegmenter(model_selection=1)
+
+
+def get_pose_estimator():
+    """Shared PoseEstimator, built on first use (hold pose_lock to run it)"""
+    # lru_cache does not stop two threads building on a cold cache
+    with _model_init_lock:
+        return _build_pose_estimator()
+
+
+def get_segmenter():
+    """Shared SkinSegmenter, built on first use (hold segmenter_lock to run it)"""
+    with _model_init_lock:
+        return _build_segmenter()
+
+
+def warm_models():
+    """Build the shared models up front so the first request does not"""
+    get_pose_estimator()
+    get_segmenter()
+
 
 class ModelManager:
     """Manage ML models and their versions"""
@@ -33,9 +132,8 @@ class ModelManager:
         """Load model manifest"""
         if os.path.exists(self.manifest_path):
             try:
-                with open(self.manifest_path, 'r') as f:
-                    self.manifest = json.load(f)
-                logger.info(f"Loaded model manifest with {len(self.manifest)} models")
+                self.manifest = _load_manifest_cached(self.manifest_path)
+                logger.debug("Loaded model manifest with %d models", len(self.manifest))
             except Exception as e:
                 logger.error(f"Error loading manifest: {str(e)}")
                 self.manifest = {}
@@ -111,29 +209,18 @@ class ModelManager:
         Returns:
             Keypoints array (33, 3) - x, y, visibility
         """
-        # Lazy load pose estimator
-        if not hasattr(self, '_pose_estimator'):
-            from models.pose_estimator import PoseEstimator
-            self._pose_estimator = PoseEstimator(
-                min_detection_confidence=0.5,
-                model_complexity=1
-            )
-            logger.info("Initialized MediaPipe Pose estimator")
-        
         # Detect pose
-        result = self._pose_estimator.detect(image)
+        pose_estimator = get_pose_estimator()
+        with pose_lock:
+            result = pose_estimator.detect(image)
         
         if result is None:
             logger.warning("No pose detected, returning placeholder keypoints")
             # Return placeholder keypoints as fallback
             return self._generate_placeholder_keypoints()
         
-        # Convert landmarks to numpy array
-        landmarks = result['landmarks']
-        keypoints = np.array([
-            [lm['x'], lm['y'], lm['visibility']]
-            for lm in landmarks
-        ], dtype=np.float32)
+        # x, y, visibility columns of the detector's landmark array
+        keypoints = result['landmarks_array'][:, [0, 1, 3]]
         
         logger.info(f"Detected pose with {len(keypoints)} keypoints, confidence: {result['confidence']:.2f}")
         
@@ -141,39 +228,7 @@ class ModelManager:
     
     def _generate_placeholder_keypoints(self) -> np.ndarray:
         """Generate placeholder keypoints as fallback"""
-        # Generate realistic-looking keypoints
-        keypoints = np.array([
-            # Nose
-            [0.5, 0.15, 0.95],
-            # Eyes
-            [0.48, 0.14, 0.9], [0.48, 0.14, 0.9], [0.47, 0.14, 0.9],
-            [0.52, 0.14, 0.9], [0.52, 0.14, 0.9], [0.53, 0.14, 0.9],
-            # Ears
-            [0.45, 0.15, 0.85], [0.55, 0.15, 0.85],
-            # Mouth
-            [0.49, 0.17, 0.9], [0.51, 0.17, 0.9],
-            # Shoulders
-            [0.4, 0.25, 0.95], [0.6, 0.25, 0.95],
-            # Elbows
-            [0.35, 0.4, 0.9], [0.65, 0.4, 0.9],
-            # Wrists
-            [0.3, 0.55, 0.85], [0.7, 0.55, 0.85],
-            # Hands
-            [0.28, 0.57, 0.8], [0.72, 0.57, 0.8],
-            [0.29, 0.56, 0.8], [0.71, 0.56, 0.8],
-            [0.3, 0.56, 0.8], [0.7, 0.56, 0.8],
-            # Hips
-            [0.42, 0.6, 0.95], [0.58, 0.6, 0.95],
-            # Knees
-            [0.41, 0.8, 0.9], [0.59, 0.8, 0.9],
-            # Ankles
-            [0.4, 0.95, 0.85], [0.6, 0.95, 0.85],
-            # Feet
-            [0.39, 0.97, 0.8], [0.61, 0.97, 0.8],
-            [0.4, 0.96, 0.8], [0.6, 0.96, 0.8],
-        ], dtype=np.float32)
-        
-        return keypoints
+        return _PLACEHOLDER_KEYPOINTS.copy()
     
     def predict_segmentation(self, image: np.ndarray) -> np.ndarray:
         """
@@ -185,14 +240,10 @@ class ModelManager:
         Returns:
             Binary mask (H, W)
         """
-        # Lazy load segmenter
-        if not hasattr(self, '_segmenter'):
-            from models.segmentation import SkinSegmenter
-            self._segmenter = SkinSegmenter(model_selection=1)
-            logger.info("Initialized MediaPipe Selfie Segmentation")
-        
         # Generate segmentation mask
-        mask = self._segmenter.segment(image, threshold=0.5)
+        segmenter = get_segmenter()
+        with segmenter_lock:
+            mask = segmenter.segment(image, threshold=0.5)
         
         logger.info(f"Generated segmentation mask: {np.sum(mask > 0)} person pixels")
         
@@ -219,16 +270,37 @@ class ModelManager:
         waist_width = features.get('waist_width_cm', 30)
         hip_width = features.get('hip_width_cm', 35)
         
-        # Simple heuristic: circumference ≈ π * (width + depth)
-        # Assume depth ≈ 0.7 * width
-        
         predictions = {
-            'chest_circumference_cm': chest_width * np.pi * 1.7,
-            'waist_circumference_cm': waist_width * np.pi * 1.7,
-            'hip_circumference_cm': hip_width * np.pi * 1.7,
-            'neck_circumference_cm': shoulder_width * 0.9,  # Rough estimate
+            'chest_circumference_cm': chest_width * CIRCUMFERENCE_FACTOR,
+            'waist_circumference_cm': waist_width * CIRCUMFERENCE_FACTOR,
+            'hip_circumference_cm': hip_width * CIRCUMFERENCE_FACTOR,
+            'neck_circumference_cm': shoulder_width * NECK_FACTOR,
         }
         
         logger.info(f"Predicted circumferences: chest={predictions['chest_circumference_cm']:.1f}cm")
         
         return predictions
+    
+    def predict_circumferences_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict circumferences for many captures at once (placeholder)
+        
+        Args:
+            features: Array (N, 5) with columns in the regressor's
+                input_features order (height, shoulder, chest, waist, hip
+                widths in cm)
+        
+        Returns:
+            Array (N, 4) float32 of chest, waist, hip and neck
+            circumferences in cm
+        """
+        self.load_model('regressor')
+        
+        features = np.asarray(features, dtype=np.float32).reshape(-1, 5)
+        predictions = np.empty((features.shape[0], 4), dtype=np.float32)
+        
+        # chest, waist, hip widths share one factor; neck comes from shoulders
+        np.multiply(features[:, 2:5], CIRCUMFERENCE_FACTOR, out=predictions[:, :3])
+        np.multiply(features[:, 1], NECK_FACTOR, out=predictions[:, 3])
+        
+        return predictions
@@ -10,6 +10,34 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Column order of PoseResult.landmarks_array
+LANDMARK_FIELDS = ('x', 'y', 'z', 'visibility')
+
+
+def landmarks_to_dicts(landmarks_array: np.ndarray) -> List[Dict]:
+    """Legacy per-landmark dicts from an (N, 4) landmarks array"""
+    return [dict(zip(LANDMARK_FIELDS, row)) for row in landmarks_array.tolist()]
+
+
+class PoseResult(dict):
+    """
+    Result of PoseEstimator.detect
+    
+    Keys: 'landmarks_array' ((N, 4) float32, columns x, y, z, visibility),
+    'confidence' and 'image_shape'. The legacy 'landmarks' list of dicts is
+    only built if something asks for it.
+    """
+    
+    def __missing__(self, key):
+        if key == 'landmarks':
+            value = self['landmarks'] = landmarks_to_dicts(self['landmarks_array'])
+            return value
+        raise KeyError(key)
+    
+    @property
+    def landmarks(self) -> List[Dict]:
+        return self['landmarks']
+
 
 class PoseEstimator:
     """
@@ -59,6 +87,22 @@ class PoseEstimator:
         'right_foot_index': 32
     }
     
+    # Skeleton drawn by visualize() (simplified), as LANDMARK_INDICES pairs
+    SKELETON_CONNECTIONS = (
+        (11, 12),  # left_shoulder - right_shoulder
+        (11, 13),  # left_shoulder - left_elbow
+        (13, 15),  # left_elbow - left_wrist
+        (12, 14),  # right_shoulder - right_elbow
+        (14, 16),  # right_elbow - right_wrist
+        (11, 23),  # left_shoulder - left_hip
+        (12, 24),  # right_shoulder - right_hip
+        (23, 24),  # left_hip - right_hip
+        (23, 25),  # left_hip - left_knee
+        (25, 27),  # left_knee - left_ankle
+        (24, 26),  # right_hip - right_knee
+        (26, 28),  # right_knee - right_ankle
+    )
+    
     def __init__(self, 
                  min_detection_confidence: float = 0.5,
                  min_tracking_confidence: float = 0.5,
@@ -81,19 +125,21 @@ class PoseEstimator:
         
         logger.info(f"Initialized MediaPipe Pose (complexity={model_complexity})")
     
-    def detect(self, image: np.ndarray) -> Optional[Dict]:
+    def detect(self, image: np.ndarray, bgr: bool = True) -> Optional[PoseResult]:
         """
         Detect pose landmarks in an image
         
         Args:
-            image: RGB image as numpy array
+            image: 3-channel image as numpy array
+            bgr: Whether the image is BGR (OpenCV default); pass False for
+                RGB frames to skip the conversion copy
         
         Returns:
             Dictionary with landmarks and metadata, or None if no pose detected
         """
-        # Convert BGR to RGB if needed
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            # Check if it's BGR (OpenCV default)
+        # MediaPipe wants C-contiguous RGB, so a BGR image needs one copy
+        # either way; cvtColor's SIMD swap is the cheapest way to make it
+        if bgr and len(image.shape) == 3 and image.shape[2] == 3:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         else:
             image_rgb = image
@@ -105,24 +151,19 @@ class PoseEstimator:
             logger.warning("No pose detected in image")
             return None
         
-        # Extract landmarks
-        landmarks = []
-        for landmark in results.pose_landmarks.landmark:
-            landmarks.append({
-                'x': landmark.x,  # Normalized [0, 1]
-                'y': landmark.y,  # Normalized [0, 1]
-                'z': landmark.z,  # Depth (relative to hips)
-                'visibility': landmark.visibility  # Confidence [0, 1]
-            })
-        
-        # Calculate overall confidence
-        avg_visibility = np.mean([lm['visibility'] for lm in landmarks])
-        
-        return {
-            'landmarks': landmarks,
-            'confidence': float(avg_visibility),
-            'image_shape': image.shape[:2]  # (height, width)
-        }
+        # Extract landmarks straight into one contiguous array: x, y
+        # (normalized [0, 1]), z (depth relative to hips), visibility
+        lm = results.pose_landmarks.landmark
+        landmarks_array = np.empty((len(lm), 4), dtype=np.float32)
+        for i, landmark in enumerate(lm):
+            landmarks_array[i] = (landmark.x, landmark.y, landmark.z, landmark.visibility)
+        
+        return PoseResult(
+            landmarks_array=landmarks_array,
+            # Overall confidence: mean visibility
+            confidence=float(landmarks_array[:, 3].mean()),
+            image_shape=image.shape[:2]  # (height, width)
+        )
     
     def get_keypoint(self, landmarks: List[Dict], name: str) -> Optional[Dict]:
         """
@@ -186,59 +227,67 @@ class PoseEstimator:
         
         return np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
     
-    def visualize(self, image: np.ndarray, landmarks: List[Dict]) -> np.ndarray:
+    def distances(self,
+                  landmarks_array: np.ndarray,
+                  pairs: np.ndarray,
+                  image_shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Calculate pixel distances between many landmark pairs at once
+        
+        Args:
+            landmarks_array: (N, 4) landmarks_array from detect()
+            pairs: Integer array (K, 2) of landmark index pairs
+            image_shape: (height, width) of image
+        
+        Returns:
+            Array (K,) of distances in pixels
+        """
+        h, w = image_shape
+        points = landmarks_array[:, :2] * np.array((w, h), dtype=np.float32)
+        deltas = points[pairs[:, 0]] - points[pairs[:, 1]]
+        return np.hypot(deltas[:, 0], deltas[:, 1])
+    
+    def visualize(self, image: np.ndarray, landmarks) -> np.ndarray:
         """
         Draw pose landmarks on image
         
         Args:
             image: Original image
-            landmarks: Detected landmarks
+            landmarks: Detected landmarks, as the (N, 4) landmarks_array or
+                the legacy list of dicts
         
         Returns:
             Image with landmarks drawn
         """
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = np.array(
+                [[lm[field] for field in LANDMARK_FIELDS] for lm in landmarks],
+                dtype=np.float32
+            ).reshape(-1, 4)
+        
         annotated_image = image.copy()
         h, w = image.shape[:2]
         
+        # Pixel positions and visibility-based colors for all landmarks at once
+        points = (landmarks[:, :2] * (w, h)).astype(np.int32).tolist()
+        visibility = landmarks[:, 3]
+        greens = (255 * visibility).astype(np.int32).tolist()
+        reds = (255 * (1 - visibility)).astype(np.int32).tolist()
+        
         # Draw landmarks
-        for landmark in landmarks:
-            x = int(landmark['x'] * w)
-            y = int(landmark['y'] * h)
-            visibility = landmark['visibility']
-            
-            # Color based on visibility
-            color = (0, int(255 * visibility), int(255 * (1 - visibility)))
-            cv2.circle(annotated_image, (x, y), 5, color, -1)
-        
-        # Draw connections (simplified)
-        connections = [
-            ('left_shoulder', 'right_shoulder'),
-            ('left_shoulder', 'left_elbow'),
-            ('left_elbow', 'left_wrist'),
-            ('right_shoulder', 'right_elbow'),
-            ('right_elbow', 'right_wrist'),
-            ('left_shoulder', 'left_hip'),
-            ('right_shoulder', 'right_hip'),
-            ('left_hip', 'right_hip'),
-            ('left_hip', 'left_knee'),
-            ('left_knee', 'left_ankle'),
-            ('right_hip', 'right_knee'),
-            ('right_knee', 'right_ankle'),
-        ]
-        
-        keypoints = self.get_keypoints_dict(landmarks)
-        
-        for start_name, end_name in connections:
-            if start_name in keypoints and end_name in keypoints:
-                start = keypoints[start_name]
-                end = keypoints[end_name]
-                
-                x1 = int(start['x'] * w)
-                y1 = int(start['y'] * h)
-                x2 = int(end['x'] * w)
-                y2 = int(end['y'] * h)
-                
-                cv2.line(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        for (x, y), green, red in zip(points, greens, reds):
+            cv2.circle(annotated_image, (x, y), 5, (0, green, red), -1)
+        
+        # Draw connections, reusing the pixel positions computed above
+        for start_idx, end_idx in self.SKELETON_CONNECTIONS:
+            if start_idx < len(points) and end_idx < len(points):
+                cv2.line(
+                    annotated_image,
+                    tuple(points[start_idx]),
+                    tuple(points[end_idx]),
+                    (0, 255, 0),
+                    2
+                )
         
         return annotated_image
     
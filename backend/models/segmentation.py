@@ -32,19 +32,22 @@ class SkinSegmenter:
         
         logger.info(f"Initialized MediaPipe Selfie Segmentation (model={model_selection})")
     
-    def segment(self, image: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    def segment(self, image: np.ndarray, threshold: float = 0.5, bgr: bool = True) -> np.ndarray:
         """
         Generate segmentation mask for person
         
         Args:
-            image: RGB image as numpy array
+            image: 3-channel image as numpy array
             threshold: Confidence threshold for segmentation [0, 1]
+            bgr: Whether the image is BGR (OpenCV default); pass False for
+                RGB frames to skip the conversion copy
         
         Returns:
             Binary mask (0 = background, 255 = person)
         """
-        # Convert BGR to RGB if needed
-        if len(image.shape) == 3 and image.shape[2] == 3:
+        # Convert BGR to RGB if needed (MediaPipe needs a contiguous buffer,
+        # so this copy cannot be replaced by a reversed-channel view)
+        if bgr and len(image.shape) == 3 and image.shape[2] == 3:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         else:
             image_rgb = image
@@ -6,7 +6,7 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 import logging
 
-from processing.utils import calculate_distance
+from processing.utils import pairwise_distances
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +51,17 @@ class BodyMeasurements:
         'right_foot_index': 32,
     }
     
+    # Keypoint pairs whose distances the measurements are built from,
+    # computed together by _segment_lengths
+    SEGMENTS = ('shoulders', 'left_hip_ankle', 'left_upper_arm', 'left_forearm', 'hips')
+    SEGMENT_PAIRS = np.array([
+        (11, 12),  # left_shoulder - right_shoulder
+        (23, 27),  # left_hip - left_ankle
+        (11, 13),  # left_shoulder - left_elbow
+        (13, 15),  # left_elbow - left_wrist
+        (23, 24),  # left_hip - right_hip
+    ], dtype=np.intp)
+    
     def __init__(self, pixels_per_cm: float = 10.0):
         """
         Initialize body measurements extractor
@@ -80,31 +91,38 @@ class BodyMeasurements:
         # Height (from top of head to ankle)
         measurements['height_cm'] = self._calculate_height(keypoints, image_height)
         
+        segments = self._segment_lengths(keypoints)
+        
         # Shoulder width
-        measurements['shoulder_width_cm'] = self._calculate_shoulder_width(keypoints)
+        measurements['shoulder_width_cm'] = self._calculate_shoulder_width(keypoints, segments)
         
         # Torso length (shoulder to hip)
         measurements['torso_length_cm'] = self._calculate_torso_length(keypoints)
         
         # Inseam (hip to ankle)
-        measurements['inseam_cm'] = self._calculate_inseam(keypoints)
+        measurements['inseam_cm'] = self._calculate_inseam(keypoints, segments)
         
         # Arm length
-        measurements['arm_length_cm'] = self._calculate_arm_length(keypoints)
+        measurements['arm_length_cm'] = self._calculate_arm_length(keypoints, segments)
         
         # Hip width
-        measurements['hip_width_cm'] = self._calculate_hip_width(keypoints)
+        measurements['hip_width_cm'] = self._calculate_hip_width(keypoints, segments)
         
         # Chest width (estimated from shoulders)
-        measurements['chest_width_cm'] = self._calculate_chest_width(keypoints)
+        measurements['chest_width_cm'] = self._calculate_chest_width(keypoints, segments)
         
         # Waist width (estimated from hips)
-        measurements['waist_width_cm'] = self._calculate_waist_width(keypoints)
+        measurements['waist_width_cm'] = self._calculate_waist_width(keypoints, segments)
         
         logger.info(f"Extracted measurements: height={measurements['height_cm']:.1f}cm")
         
         return measurements
     
+    def _segment_lengths(self, keypoints: np.ndarray) -> Dict[str, float]:
+        """Distances for all SEGMENT_PAIRS, in pixels, with one vectorized call"""
+        lengths = pairwise_distances(keypoints, self.SEGMENT_PAIRS)
+        return dict(zip(self.SEGMENTS, lengths.tolist()))
+    
     def _calculate_height(self, keypoints: np.ndarray, image_height: int) -> float:
         """Calculate height from nose to ankle"""
         nose = keypoints[self.KEYPOINT_INDICES['nose']]
@@ -124,17 +142,11 @@ class BodyMeasurements:
         
         return float(height_cm)
     
-    def _calculate_shoulder_width(self, keypoints: np.ndarray) -> float:
+    def _calculate_shoulder_width(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Calculate shoulder width"""
-        left_shoulder = keypoints[self.KEYPOINT_INDICES['left_shoulder']]
-        right_shoulder = keypoints[self.KEYPOINT_INDICES['right_shoulder']]
-        
-        width_px = calculate_distance(
-            (left_shoulder[0], left_shoulder[1]),
-            (right_shoulder[0], right_shoulder[1])
-        )
+        segments = segments or self._segment_lengths(keypoints)
         
-        width_cm = width_px / self.pixels_per_cm
+        width_cm = segments['shoulders'] / self.pixels_per_cm
         
         return float(width_cm)
     
@@ -154,67 +166,43 @@ class BodyMeasurements:
         
         return float(length_cm)
     
-    def _calculate_inseam(self, keypoints: np.ndarray) -> float:
+    def _calculate_inseam(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Calculate inseam from hip to ankle"""
-        left_hip = keypoints[self.KEYPOINT_INDICES['left_hip']]
-        left_ankle = keypoints[self.KEYPOINT_INDICES['left_ankle']]
+        segments = segments or self._segment_lengths(keypoints)
         
-        length_px = calculate_distance(
-            (left_hip[0], left_hip[1]),
-            (left_ankle[0], left_ankle[1])
-        )
-        
-        length_cm = length_px / self.pixels_per_cm
+        length_cm = segments['left_hip_ankle'] / self.pixels_per_cm
         
         return float(length_cm)
     
-    def _calculate_arm_length(self, keypoints: np.ndarray) -> float:
+    def _calculate_arm_length(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Calculate arm length from shoulder to wrist"""
-        left_shoulder = keypoints[self.KEYPOINT_INDICES['left_shoulder']]
-        left_elbow = keypoints[self.KEYPOINT_INDICES['left_elbow']]
-        left_wrist = keypoints[self.KEYPOINT_INDICES['left_wrist']]
-        
-        upper_arm = calculate_distance(
-            (left_shoulder[0], left_shoulder[1]),
-            (left_elbow[0], left_elbow[1])
-        )
+        segments = segments or self._segment_lengths(keypoints)
         
-        forearm = calculate_distance(
-            (left_elbow[0], left_elbow[1]),
-            (left_wrist[0], left_wrist[1])
-        )
-        
-        length_px = upper_arm + forearm
+        length_px = segments['left_upper_arm'] + segments['left_forearm']
         length_cm = length_px / self.pixels_per_cm
         
         return float(length_cm)
     
-    def _calculate_hip_width(self, keypoints: np.ndarray) -> float:
+    def _calculate_hip_width(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Calculate hip width"""
-        left_hip = keypoints[self.KEYPOINT_INDICES['left_hip']]
-        right_hip = keypoints[self.KEYPOINT_INDICES['right_hip']]
-        
-        width_px = calculate_distance(
-            (left_hip[0], left_hip[1]),
-            (right_hip[0], right_hip[1])
-        )
+        segments = segments or self._segment_lengths(keypoints)
         
-        width_cm = width_px / self.pixels_per_cm
+        width_cm = segments['hips'] / self.pixels_per_cm
         
         return float(width_cm)
     
-    def _calculate_chest_width(self, keypoints: np.ndarray) -> float:
+    def _calculate_chest_width(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Estimate chest width from shoulder width"""
-        shoulder_width = self._calculate_shoulder_width(keypoints)
+        shoulder_width = self._calculate_shoulder_width(keypoints, segments)
         
         # Chest is typically ~90% of shoulder width
         chest_width = shoulder_width * 0.9
         
         return float(chest_width)
     
-    def _calculate_waist_width(self, keypoints: np.ndarray) -> float:
+    def _calculate_waist_width(self, keypoints: np.ndarray, segments: Optional[Dict[str, float]] = None) -> float:
         """Estimate waist width from hip width"""
-        hip_width = self._calculate_hip_width(keypoints)
+        hip_width = self._calculate_hip_width(keypoints, segments)
         
         # Waist is typically ~75% of hip width
         waist_width = hip_width * 0.75
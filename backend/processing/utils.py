@@ -87,6 +87,21 @@ def calculate_distance(p1: Tuple[float, float], p2: Tuple[float, float]) -> floa
     return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
 
 
+def pairwise_distances(points: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distances between many point pairs in one pass
+    
+    Args:
+        points: Array of points (N, >=2); only the x, y columns are used
+        pairs: Integer array (K, 2) of row indices into points
+    
+    Returns:
+        Array (K,) of distances
+    """
+    deltas = points[pairs[:, 0], :2] - points[pairs[:, 1], :2]
+    return np.hypot(deltas[:, 0], deltas[:, 1])
+
+
 def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
     """
     Convert RGB to CIELab color space
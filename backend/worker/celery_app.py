@@ -3,7 +3,7 @@ Celery application configuration
 """
 
 from celery import Celery
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.signals import task_prerun, task_postrun, task_failure, worker_process_init
 import logging
 import os
 
@@ -38,10 +38,17 @@ celery_app.conf.update(
     worker_prefetch_multiplier=int(os.getenv('WORKER_PREFETCH_MULTIPLIER', '4')),
     worker_max_tasks_per_child=int(os.getenv('WORKER_MAX_TASKS_PER_CHILD', '100')),
     
-    # Task routing
+    # Task routing: CPU-bound inference goes to 'processing' (prefork pool,
+    # prefetch 1), I/O-bound upload finalization and view refreshes to
+    # 'uploads' (thread pool).
+    # Globs so routes apply whether tasks are imported as worker.tasks or
+    # backend.worker.tasks
+    task_default_queue='processing',
     task_routes={
-        'worker.tasks.process_capture': {'queue': 'processing'},
-        'worker.tasks.task_*': {'queue': 'processing'},
+        '*worker.tasks.process_capture': {'queue': 'processing'},
+        '*worker.tasks.process_capture_upload': {'queue': 'uploads'},
+        '*worker.tasks.refresh_user_metrics_view': {'queue': 'uploads'},
+        '*worker.tasks.task_*': {'queue': 'processing'},
     },
     
     # Result backend settings
@@ -59,6 +66,16 @@ celery_app.conf.update(
 
 
 # Signal handlers
+@worker_process_init.connect
+def warm_models_handler(**kwargs):
+    """Build the shared MediaPipe models in each prefork child before its first task"""
+    from models import warm_models
+    try:
+        warm_models()
+    except Exception as e:
+        logger.warning(f"Could not preload models, will build on first use: {str(e)}")
+
+
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **extra):
     """Log task start"""
@@ -4,8 +4,12 @@ Celery tasks for capture processing pipeline
 
 from celery import Task
 from backend.worker.celery_app import celery_app
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import logging
+import shutil
+import threading
+import uuid
 import sys
 import os
 from datetime import datetime
@@ -21,19 +25,132 @@ logger = logging.getLogger(__name__)
 
 class DatabaseTask(Task):
     """Base task with database session"""
+    # Shared by every task in the process; thread pools start many tasks
+    # at once, so creation is locked
     _db = None
+    _redis = None
+    _init_lock = threading.Lock()
     
     @property
     def db(self):
-        if self._db is None:
-            settings = get_settings()
-            db_instance = init_db(
-                settings.DATABASE_URL,
-                pool_size=5,  # Smaller pool for workers
-                max_overflow=10
+        if DatabaseTask._db is None:
+            with DatabaseTask._init_lock:
+                if DatabaseTask._db is None:
+                    settings = get_settings()
+                    DatabaseTask._db = init_db(
+                        settings.DATABASE_URL,
+                        pool_size=settings.WORKER_DB_POOL_SIZE,
+                        max_overflow=settings.WORKER_DB_MAX_OVERFLOW
+                    )
+        return DatabaseTask._db
+    
+    @property
+    def redis(self):
+        if DatabaseTask._redis is None:
+            with DatabaseTask._init_lock:
+                if DatabaseTask._redis is None:
+                    import redis
+                    DatabaseTask._redis = redis.Redis.from_url(get_settings().REDIS_URL)
+        return DatabaseTask._redis
+    
+    def invalidate_capture_cache(self, capture_id: str, user_id=None):
+        """Drop the API's cached status/results/stats after a status write"""
+        from app.storage.redis_client import invalidate_capture_cache
+        invalidate_capture_cache(self.redis, capture_id, user_id)
+    
+    def schedule_user_metrics_refresh(self):
+        """Queue a mv_user_metrics refresh unless one is already pending"""
+        from app.storage.redis_client import (
+            USER_METRICS_REFRESH_KEY,
+            USER_METRICS_REFRESH_TTL_SECONDS,
+            USER_METRICS_REFRESH_DELAY_SECONDS
+        )
+        import redis
+        
+        try:
+            pending = not self.redis.set(
+                USER_METRICS_REFRESH_KEY, b"1", nx=True, ex=USER_METRICS_REFRESH_TTL_SECONDS
             )
-            self._db = db_instance
-        return self._db
+        except redis.RedisError as e:
+            logger.warning(f"Error checking pending metrics view refresh: {str(e)}")
+            pending = False
+        
+        if not pending:
+            refresh_user_metrics_view.apply_async(countdown=USER_METRICS_REFRESH_DELAY_SECONDS)
+
+
+@celery_app.task(base=DatabaseTask, bind=True, max_retries=3)
+def process_capture_upload(self, capture_id: str, spool_paths: dict = None, object_keys: dict = None):
+    """
+    Move a capture's uploads into MinIO and queue processing
+    
+    Images come from the spool directory (multipart uploads) or from the
+    presigned staging keys. Strips EXIF, uploads each image, records
+    Artifact rows, flips the capture from UPLOADING to QUEUED and removes
+    the spooled files or staging objects.
+    """
+    logger.info(f"Storing uploads for capture {capture_id}")
+    
+    from app.capture.service import CaptureService
+    from app.storage import get_minio_client
+    
+    try:
+        # MinIO transfers run before any connection is checked out, so the
+        # pool is only held for the short commit below
+        artifacts = CaptureService.store_raw_images(
+            uuid.UUID(capture_id),
+            spool_paths=spool_paths,
+            object_keys=object_keys
+        )
+        
+        with self.db.get_session() as db:
+            capture = db.query(Capture).filter(Capture.id == capture_id).first()
+            if not capture:
+                get_minio_client().delete_files(
+                    'raw', [artifact.bucket_path.split('/', 1)[1] for artifact in artifacts]
+                )
+                raise ValueError(f"Capture {capture_id} not found")
+            
+            db.add_all(artifacts)
+            capture.status = CaptureStatus.QUEUED
+            user_id = capture.user_id
+            db.commit()
+        
+        self.invalidate_capture_cache(capture_id, user_id)
+        
+        # Sources are only removed once the artifacts are committed
+        if spool_paths:
+            shutil.rmtree(CaptureService.spool_dir(capture_id), ignore_errors=True)
+        if object_keys:
+            try:
+                get_minio_client().delete_files('raw', list(object_keys.values()))
+            except Exception as e:
+                logger.warning(f"Error removing staged uploads for capture {capture_id}: {str(e)}")
+        
+        process_capture.delay(capture_id)
+        
+        return {
+            'capture_id': capture_id,
+            'status': 'queued',
+            'message': 'Uploads stored'
+        }
+    
+    except Exception as e:
+        logger.error(f"Error storing uploads for capture {capture_id}: {str(e)}", exc_info=True)
+        
+        try:
+            with self.db.get_session() as db:
+                capture = db.query(Capture).filter(Capture.id == capture_id).first()
+                if capture:
+                    capture.status = CaptureStatus.FAILED
+                    capture.error_message = str(e)
+                    db.commit()
+                    self.invalidate_capture_cache(capture_id, capture.user_id)
+        except Exception as db_error:
+            logger.error(f"Error updating capture status: {str(db_error)}")
+        
+        # Sources are kept so the retry can pick them up
+        raise self.retry(exc=e, countdown=10)
 
 
 @celery_app.task(base=DatabaseTask, bind=True, max_retries=3)
@@ -67,6 +184,7 @@ def process_capture(self, capture_id: str):
             capture.status = CaptureStatus.PROCESSING
             capture.processing_started_at = datetime.utcnow()
             db.commit()
+            self.invalidate_capture_cache(capture_id, capture.user_id)
             
             # Get artifacts (images)
             from app.storage import get_minio_client
@@ -221,6 +339,8 @@ def process_capture(self, capture_id: str):
             capture.processing_completed_at = datetime.utcnow()
             
             db.commit()
+            self.invalidate_capture_cache(capture_id, capture.user_id)
+            self.schedule_user_metrics_refresh()
             
             logger.info(f"Capture {capture_id} processed successfully")
             
@@ -241,6 +361,7 @@ def process_capture(self, capture_id: str):
                     capture.status = CaptureStatus.FAILED
                     capture.error_message = str(e)
                     db.commit()
+                    self.invalidate_capture_cache(capture_id, capture.user_id)
         except Exception as db_error:
             logger.error(f"Error updating capture status: {str(db_error)}")
         
@@ -248,6 +369,28 @@ def process_capture(self, capture_id: str):
         raise self.retry(exc=e, countdown=60)
 
 
+@celery_app.task(base=DatabaseTask, bind=True, max_retries=3)
+def refresh_user_metrics_view(self):
+    """
+    Refresh the mv_user_metrics materialized view
+    
+    CONCURRENTLY keeps the view readable by the dashboard while it is
+    rebuilt. The pending flag is cleared first so captures completing
+    during the refresh schedule another one.
+    """
+    from app.storage.redis_client import USER_METRICS_REFRESH_KEY
+    
+    try:
+        self.redis.delete(USER_METRICS_REFRESH_KEY)
+        with self.db.get_session() as db:
+            db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_user_metrics"))
+        logger.info("Refreshed mv_user_metrics")
+    
+    except Exception as e:
+        logger.error(f"Error refreshing mv_user_metrics: {str(e)}", exc_info=True)
+        raise self.retry(exc=e, countdown=30)
+
+
 # Individual pipeline stage tasks (placeholders for Phase 2 implementation)
 
 @celery_app.task(bind=True)
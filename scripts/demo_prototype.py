@@ -49,7 +49,7 @@ def demo():
     
     if response.status_code == 200:
         data = response.json()
-        print(f"[SUCCESS] Found {data['total']} captures:")
+        print(f"[SUCCESS] Found {len(data['captures'])} recent captures:")
         
         captures = data['captures']
         for i, capture in enumerate(captures[:3], 1):
@@ -102,7 +102,7 @@ def upload_images(token):
     for f in files.values():
         f[1].close()
     
-    if response.status_code == 201:
+    if response.status_code in (201, 202):  # 202: images queued for upload
         data = response.json()
         capture_id = data.get("capture_id")
         print(f"\n✅ Images uploaded successfully!")
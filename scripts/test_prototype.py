@@ -116,7 +116,7 @@ def upload_test_images(token):
     for f in files.values():
         f.close()
     
-    if response.status_code == 201:
+    if response.status_code in (201, 202):  # 202: images queued for upload
         result = response.json()
         capture_id = result['capture_id']
         print_success(f"Images uploaded successfully!")
@@ -245,14 +245,14 @@ def view_dashboard(token):
     
     if response.status_code == 200:
         data = response.json()
-        print_success(f"Found {data.get('total', 0)} total captures")
+        print_success(f"Found {len(data.get('captures', []))} recent captures")
         
         for i, capture in enumerate(data.get('captures', [])[:3], 1):
             print(f"{i}. {capture['capture_id'][:8]}... - {capture['status']} "
                   f"({capture['created_at'][:10]})")
         
         if data.get('has_more'):
-            print_info(f"... and {data['total'] - len(data['captures'])} more")
+            print_info("... and more (follow next_cursor)")
 
 def main():
     """Run complete prototype test"""